@@ -21,41 +21,58 @@
 # 2. use spacy to parse sentence, get noun chunks from it
 # 3. merge noun chunks to get VSO triples.
 # 4. Count the most common VSO triples for the most common verbs in a text.
+# 5. Or count the candidate VSO triples of all the verbs, to be filtered by the most common verbs afterwards.
+# 6. get the same VSO triples from arrays of the token attributes, without Span objects and dicts per sentence.
 
 
-import spacy
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from collections import Counter
+import numpy as np
+from models import get_nlp, DEFAULT_MODEL, VSO_DISABLE
 
-nlp = spacy.load("en_core_web_sm")
+
+# the dependency labels and parts of speech of the roots of noun chunks (as in spacy.lang.en.syntax_iterators)
+NP_LABELS = ("oprd", "nsubj", "dobj", "nsubjpass", "pcomp", "pobj", "dative", "appos", "attr", "ROOT")
+NP_POS = ("NOUN", "PROPN", "PRON")
+
+
+def get_noun_chunks(sent) -> List[Tuple]:
+    """get the noun chunks of a parsed sentence (spaCy Span or Doc) as (noun, dependency, head lemma) tuples."""
+    noun_chunk = tuple()
+    chunks = []
+    for chunk in sent.noun_chunks:
+        noun = chunk.text
+        dependency = chunk.root.dep_
+        head = chunk.root.head.lemma_
+        noun_chunk = noun, dependency, head
+        chunks.append(noun_chunk)
+    return chunks
 
 
 class VsoGenerator:
     """
     get triples of the form verb-subject-object for a number of most common verbs
-    :param sentence: the sentence to parse.
-    :param target_verb: a list of verbs for which we want to find the vso triples.
+    :param sentence: the sentence to parse, either plain text or an already parsed spaCy Span/Doc.
+    :param target_verb: a list of verbs for which we want to find the vso triples, None keeps the triples of all the
+        verbs (the candidates, which are filtered by the most common verbs later).
+    :param chunks: noun chunks collected earlier (see get_noun_chunks), then the sentence is not parsed at all.
+    :param model: the name of the spaCy model to parse plain text with.
     """
-    vso_counts = Counter()
 
-    def __init__(self, sentence, target_verb):
+    def __init__(self, sentence, target_verb, chunks=None, model=DEFAULT_MODEL):
         self.sentence = sentence
-        self.doc = nlp(self.sentence)
+        # only plain text needs to go through the pipeline (without NER), a parsed sentence is reused as it is
+        if isinstance(self.sentence, str):
+            self.doc = get_nlp(model)(self.sentence, disable=VSO_DISABLE)
+        else:
+            self.doc = self.sentence
         self.target_verb = target_verb
-        self.chunks = self.get_noun_chunk_spacy()
+        self.chunks = chunks if chunks is not None else self.get_noun_chunk_spacy()
         self.vso = self.merge_into_vso()
 
     def get_noun_chunk_spacy(self) -> List[Tuple]:
         """parse a sentence, get noun chunks out of it."""
-        noun_chunk = tuple()
-        chunks = []
-        for chunk in self.doc.noun_chunks:
-            noun = chunk.text
-            dependency = chunk.root.dep_
-            head = chunk.root.head.lemma_
-            noun_chunk = noun, dependency, head
-            chunks.append(noun_chunk)
-        return chunks
+        return get_noun_chunks(self.doc)
 
     def merge_into_vso(self) -> List[Tuple]:
         """
@@ -74,7 +91,7 @@ class VsoGenerator:
                 # get the verb (or 'by' etc.)
                 verb = noun_dep_head[2]
                 # when verb among target verb or verb is 'by', we keep it
-                if verb in self.target_verb or verb == 'by':
+                if self.target_verb is None or verb in self.target_verb or verb == 'by':
                     # make the verb the key of the vso_dict.
                     # the value is still a dict, dep is the key of it, noun the value
                     if verb in vso_dict:
@@ -93,20 +110,119 @@ class VsoGenerator:
                         vso.append((key, vso_dict['by']['pobj'], vso_dict[key]['nsubjpass']))
         return vso
 
-    @classmethod
-    def get_vso_all_text(cls, self) -> Counter:
+    def get_vso_all_text(self, vso_counts=None) -> Counter:
         """
-        combine all the target vso chunks from sentences to get the vso chunks and their counts for the whole text
+        count the target vso chunks of the sentence into 'vso_counts', which collects the vso chunks and their counts
+        for the whole text.
         """
+        if vso_counts is None:
+            vso_counts = Counter()
         if self.vso:
-            for triple in self.vso:
-                cls.vso_counts[triple] += 1
-        return cls.vso_counts
+            vso_counts.update(self.vso)
+        return vso_counts
 
-    @classmethod
-    def reset(cls):
-        """
-        empty the class variable to save memory and to avoid potential interferences among different file objects
-        """
-        cls.vso_counts.clear()
 
+def left_edges(heads: np.ndarray) -> np.ndarray:
+    """the first token of the subtree of every token (Token.left_edge), from the absolute indices of the heads."""
+    edges = np.arange(len(heads))
+    while True:
+        lower = edges.copy()
+        # every token passes its left edge up to its head, one level of the tree at a time
+        np.minimum.at(lower, heads, edges)
+        if np.array_equal(lower, edges):
+            return edges
+        edges = lower
+
+
+def noun_chunk_roots(sents: np.ndarray, pos: np.ndarray, dep: np.ndarray, heads: np.ndarray, edges: np.ndarray,
+                     strings) -> List[int]:
+    """
+    the last (root) tokens of the noun chunks, the same ones as Span.noun_chunks gives for every sentence: nouns,
+    proper nouns and pronouns with one of the NP_LABELS, or coordinated to one, which are not inside the chunk before.
+    """
+    np_deps = np.array([strings[label] for label in NP_LABELS], dtype=dep.dtype)
+    conj = strings["conj"]
+    nominal = np.isin(pos, np.array([strings[tag] for tag in NP_POS], dtype=pos.dtype))
+    candidates = nominal & (np.isin(dep, np_deps) | (dep == conj))
+    roots = []
+    sentence, prev_end = -1, -1
+    for i in np.flatnonzero(candidates).tolist():
+        if sents[i] != sentence:
+            sentence, prev_end = sents[i], -1
+        if edges[i] <= prev_end:
+            continue
+        if dep[i] == conj:
+            head = heads[i]
+            while dep[head] == conj and heads[head] < head:
+                head = heads[head]
+            if dep[head] not in np_deps:
+                continue
+        prev_end = i
+        roots.append(i)
+    return roots
+
+
+def extract_vso(text: str, strings, sent_start: np.ndarray, pos: np.ndarray, lemma: np.ndarray, idx: np.ndarray,
+                length: np.ndarray, head: np.ndarray, dep: np.ndarray,
+                target_ids: Optional[np.ndarray] = None) -> List[Tuple[int, str, str]]:
+    """
+    the VSO triples of a parsed text, the same ones (in the same order) as VsoGenerator.merge_into_vso of every
+    sentence, from the columns of Doc.to_array (SENT_START, POS, LEMMA, IDX, LENGTH, HEAD, DEP) of the text.
+    'target_ids' are the lemma hash ids of the target verbs, None keeps the triples of all the verbs.
+    the noun chunks are grouped by sentence and head lemma with numpy instead of dicts, and the verb of a triple is
+    its lemma hash id, the subject and object are the texts of the noun chunks.
+    the columns of several docs can be given at once (see preprocessing.count_vso), with their texts joined in 'text'
+    and 'idx' shifted accordingly, as long as the first token of every doc starts a sentence.
+    """
+    if not len(pos):
+        return []
+    heads = np.arange(len(pos)) + head.astype(np.int64)
+    starts = sent_start == 1
+    starts[0] = True
+    sents = np.cumsum(starts) - 1
+    edges = left_edges(heads)
+    roots = np.array(noun_chunk_roots(sents, pos, dep, heads, edges, strings), dtype=np.int64)
+    if not len(roots):
+        return []
+    verbs = lemma[heads[roots]]
+    by = strings["by"]
+    if target_ids is not None:
+        keep = np.isin(verbs, target_ids) | (verbs == by)
+        roots, verbs = roots[keep], verbs[keep]
+        if not len(roots):
+            return []
+    deps = dep[roots]
+    # one group per sentence and head lemma, in the order of their first chunk
+    verb_ids, verb_codes = np.unique(verbs, return_inverse=True)
+    _, first, groups = np.unique(sents[roots] * len(verb_ids) + verb_codes.reshape(-1), return_index=True,
+                                 return_inverse=True)
+    groups = groups.reshape(-1)
+    positions = np.arange(len(roots))
+    last = {}
+    for label in ("nsubj", "dobj", "nsubjpass", "pobj"):
+        # the last chunk of every group with this dependency, -1 if there is none
+        last[label] = np.full(len(first), -1)
+        mask = deps == strings[label]
+        np.maximum.at(last[label], groups[mask], positions[mask])
+    group_sents = sents[roots[first]]
+    # active sentences, e.g. 'I eat an apple.'
+    active = np.flatnonzero((last["nsubj"] >= 0) & (last["dobj"] >= 0))
+    # passive sentences, e.g. 'The apple is eaten by me.': the object of 'by' is the subject of every passive verb
+    by_groups = np.flatnonzero((verbs[first] == by) & (last["pobj"] >= 0))
+    agents = dict(zip(group_sents[by_groups].tolist(), last["pobj"][by_groups].tolist()))
+    passive = np.flatnonzero((last["nsubjpass"] >= 0) & np.isin(group_sents, group_sents[by_groups]))
+    found = np.concatenate([active, passive])
+    kinds = np.repeat([0, 1], [len(active), len(passive)])
+    order = np.lexsort((first[found], kinds, group_sents[found]))
+
+    def chunk_text(position):
+        root = roots[position]
+        return text[idx[edges[root]]:idx[root] + length[root]]
+    triples = []
+    for group, kind in zip(found[order].tolist(), kinds[order].tolist()):
+        verb = int(verbs[first[group]])
+        if kind == 0:
+            triples.append((verb, chunk_text(last["nsubj"][group]), chunk_text(last["dobj"][group])))
+        else:
+            triples.append((verb, chunk_text(agents[group_sents[group]]), chunk_text(last["nsubjpass"][group])))
+    return triples
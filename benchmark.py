@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> benchmark the parsing pipeline, so that changes in speed can be tracked over releases
+# 1. time every stage of the pipeline for a file: reading paragraphs, spaCy, Preprocessor, NER, verbs, VSO, html
+# 2. compare the ways of running it (serial, batched, pool, shards) on the same input
+# 3. make synthetic larger corpora by repeating the bundled ones
+# 4. write the results as json
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from glob import glob
+from multiprocessing import Pool
+from typing import Dict, List
+
+from corpus_stats import CorpusStats
+from models import get_lexical_nlp, get_nlp, DEFAULT_MODEL
+from output_sinks import HtmlSink
+from paragraph_sentence_gen import generate_para
+from parsing_file import (analyse_one_file, analyse_one_file_sharded, get_vso_one_file, peak_rss, summarise_file,
+                          BATCH_SIZE, FileReport)
+from preprocessing import Preprocessor
+from main import run_stage
+
+MODES = ('serial', 'batched', 'pool', 'sharded', 'lexical')
+DEFAULT_FILES = [file for file in sorted(glob('data/*.txt')) if not file.endswith('test_text.txt')]
+
+
+def get_cli() -> ArgumentParser:
+    """Command line interface of the benchmark."""
+    parser = ArgumentParser("benchmark", description="Time the stages of the parsing pipeline and compare the ways "
+                                                     "of running it.")
+    parser.add_argument('files', nargs='*', default=DEFAULT_FILES, metavar='FILE',
+                        help="The corpora to run the benchmark on (default: the bundled data/*.txt).")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1], metavar='N',
+                        help="Also run on synthetic corpora made of every file repeated N times.")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES),
+                        help="The ways of running the whole pipeline to compare.")
+    parser.add_argument('--batch-size', '-b', type=int, default=BATCH_SIZE,
+                        help="The nlp.pipe batch size of the batched, pool and sharded modes.")
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1,
+                        help="The number of processes of the batched (nlp.pipe) and sharded modes.")
+    parser.add_argument('--shard-size', '-s', type=int, default=50,
+                        help="The number of paragraphs per shard in the sharded mode.")
+    parser.add_argument('--model', '-m', type=str, default=DEFAULT_MODEL, help="The spaCy model to benchmark.")
+    parser.add_argument('--json', '-j', type=str, default=None, metavar='FILE',
+                        help="Write the results as json into this file (default: print them).")
+    return parser
+
+
+def scaled_file(file: str, scale: int, directory: str) -> str:
+    """a copy of 'file' with its content repeated 'scale' times, in 'directory' (the file itself for scale 1)."""
+    if scale == 1:
+        return file
+    name, extension = os.path.splitext(os.path.basename(file))
+    path = os.path.join(directory, f'{name}_x{scale}{extension}')
+    with open(file, 'rb') as infile:
+        content = infile.read()
+    with open(path, 'wb') as otf:
+        for _ in range(scale):
+            # a blank line between the copies, so the last paragraph of a copy is not glued to the next one
+            otf.write(content + b'\n\n')
+    return path
+
+
+def time_stages(file: str, batch_size: int, model: str) -> Dict:
+    """
+    run the pipeline for one file in this process, timing every stage on its own (in seconds).
+    'spacy' is the time spent waiting for nlp.pipe, the other stages are the Python code around it.
+    """
+    stages = dict.fromkeys(['generate_para', 'spacy', 'Preprocessor', 'get_ner', 'get_verb', 'get_vso_candidates',
+                            'get_vso_one_file', 'write_html'], 0.0)
+    nlp = get_nlp(model)
+
+    t = time.perf_counter()
+    paragraphs = list(generate_para(file))
+    stages['generate_para'] = time.perf_counter() - t
+
+    stats = CorpusStats()
+    docs = nlp.pipe(paragraphs, batch_size=batch_size)
+    while True:
+        t = time.perf_counter()
+        doc = next(docs, None)
+        stages['spacy'] += time.perf_counter() - t
+        if doc is None:
+            break
+        t = time.perf_counter()
+        para_obj = Preprocessor(doc.text, doc)
+        para_obj.get_sum_token_sent_char(stats)
+        stages['Preprocessor'] += time.perf_counter() - t
+        t = time.perf_counter()
+        para_obj.get_ner(stats.ner_counts)
+        stages['get_ner'] += time.perf_counter() - t
+        t = time.perf_counter()
+        para_obj.get_verb(stats.verb_counts)
+        stages['get_verb'] += time.perf_counter() - t
+        t = time.perf_counter()
+        para_obj.get_vso_candidates(stats.vso_candidates)
+        stages['get_vso_candidates'] += time.perf_counter() - t
+
+    t = time.perf_counter()
+    avg_word_len, avg_sent_len, top_ent, top_verb, stats = summarise_file(stats, 15, 3)
+    vso_triples = get_vso_one_file(stats, top_verb, 15)
+    stages['get_vso_one_file'] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    fd, outfile = tempfile.mkstemp(suffix='.html')
+    os.close(fd)
+    sink = HtmlSink(outfile, 15, 3, 15)
+    sink.start([file])
+    sink.write(FileReport(file, avg_word_len, avg_sent_len, top_ent, top_verb, vso_triples))
+    sink.close()
+    os.remove(outfile)
+    stages['write_html'] = time.perf_counter() - t
+
+    total = sum(stages.values())
+    return {
+        'paragraphs': len(paragraphs),
+        'tokens': stats.token_sum,
+        'sentences': stats.sent_sum,
+        'stages': {name: round(seconds, 4) for name, seconds in stages.items()},
+        'total': round(total, 4),
+        'tokens_per_second': round(stats.token_sum / total, 1),
+        'paragraphs_per_second': round(len(paragraphs) / total, 1),
+    }
+
+
+def time_mode(mode: str, files: List[str], args) -> Dict:
+    """run the whole pipeline (analyse_one_file) for 'files' in one of the MODES and time it."""
+    if mode == 'lexical':
+        # the lexical pipeline is loaded apart from the full model (which time_stages has loaded and run already), so
+        # it is loaded and run on one doc before the timer starts as well
+        get_lexical_nlp(args.model, [])('Warm up.')
+    t = time.perf_counter()
+    if mode == 'serial':
+        reports = [analyse_one_file(file, 15, 3, 15, 1, 1, None, args.model) for file in files]
+    elif mode == 'batched':
+        reports = [analyse_one_file(file, 15, 3, 15, args.batch_size, args.workers, None, args.model)
+                   for file in files]
+    elif mode == 'lexical':
+        # only tokens and sentences, batched like 'batched'
+        reports = [analyse_one_file(file, 15, 3, 15, args.batch_size, args.workers, None, args.model, lexical=[])
+                   for file in files]
+    elif mode == 'pool':
+        reports = run_stage(analyse_one_file, [(file, 15, 3, 15, args.batch_size, 1, None, args.model)
+                                               for file in files], 1)
+    else:
+        with Pool(args.workers) as pool:
+            reports = [analyse_one_file_sharded(file, 15, 3, 15, pool, args.shard_size, args.batch_size, None,
+                                                args.model) for file in files]
+    seconds = time.perf_counter() - t
+    return {'seconds': round(seconds, 4), 'peak_rss_mb': max(report.peak_rss for report in reports)}
+
+
+def main():
+    args = get_cli().parse_args()
+    directory = tempfile.mkdtemp()
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'model': args.model,
+        'batch_size': args.batch_size,
+        'workers': args.workers,
+        'shard_size': args.shard_size,
+        'files': [],
+        'modes': [],
+    }
+    try:
+        for scale in args.scale:
+            files = [scaled_file(file, scale, directory) for file in args.files]
+            for file in files:
+                print(f"* stages: {file}", file=sys.stderr)
+                result = time_stages(file, args.batch_size, args.model)
+                result.update({'file': file, 'scale': scale, 'bytes': os.path.getsize(file)})
+                results['files'].append(result)
+            tokens = sum(r['tokens'] for r in results['files'] if r['scale'] == scale)
+            paragraphs = sum(r['paragraphs'] for r in results['files'] if r['scale'] == scale)
+            for mode in args.modes:
+                print(f"* mode {mode}, scale {scale}", file=sys.stderr)
+                result = time_mode(mode, files, args)
+                result.update({'mode': mode, 'scale': scale,
+                               'tokens_per_second': round(tokens / result['seconds'], 1),
+                               'paragraphs_per_second': round(paragraphs / result['seconds'], 1)})
+                results['modes'].append(result)
+    finally:
+        shutil.rmtree(directory)
+    results['peak_rss_mb'] = {'main': peak_rss(), 'workers': peak_rss(children=True)}
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as otf:
+            json.dump(results, otf, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> analyse a growing corpus (e.g. a log which gets longer every day) incrementally
+# 1. keep the merged statistics of a file and the byte offset up to which it was parsed
+# 2. check that the file still starts with the same text (a hash of the part parsed before)
+# 3. parse only the new paragraphs and merge them into the saved statistics
+# 4. go on in the middle of a paragraph which is split into pieces (e.g. a log without blank lines)
+
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from corpus_stats import CorpusStats
+from paragraph_sentence_gen import drop_boilerplate, open_corpus, read_pieces, ReadState
+from parse_cache import settings
+
+
+def checkpoint_file(directory, file, model, config: Dict) -> str:
+    """the checkpoint of 'file' in 'directory', one per file path, model and pipeline configuration 'config'."""
+    key = hashlib.sha256('\n'.join([os.path.abspath(file), settings(model, config)]).encode('utf-8')).hexdigest()
+    return os.path.join(directory, key + '.json')
+
+
+def prefix_hash(file, offset, block_size=1 << 20) -> str:
+    """the sha256 of the first 'offset' bytes of the (decompressed) file."""
+    sha = hashlib.sha256()
+    with open_corpus(file) as infile:
+        while offset > 0:
+            block = infile.read(min(block_size, offset))
+            if not block:
+                break
+            sha.update(block)
+            offset -= len(block)
+    return sha.hexdigest()
+
+
+def load_checkpoint(path, file) -> Tuple[Optional[CorpusStats], Optional[ReadState]]:
+    """
+    the statistics saved in the checkpoint 'path' and the state where reading goes on (see read_pieces), or
+    (None, ReadState(0)) if there is no checkpoint or 'file' does not start with the text parsed before any more
+    (e.g. it was edited). the state is None if the end of the text was reached before (the footer of Project
+    Gutenberg, see drop_boilerplate): nothing after it is parsed.
+    """
+    try:
+        with open(path, encoding='utf-8') as infile:
+            data = json.load(infile)
+        state = ReadState(**data['state'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, ReadState(0)
+    if prefix_hash(file, state.offset) != data['prefix_hash']:
+        return None, ReadState(0)
+    return CorpusStats.from_dict(data['stats']), None if data.get('ended') else state
+
+
+def save_checkpoint(path, file, stats: CorpusStats, state: ReadState, ended=False) -> None:
+    """
+    save 'stats', the statistics of 'file' up to the 'state' where reading goes on (or where the text 'ended'),
+    written next to 'path' and then renamed.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    data = {'file': file, 'state': state._asdict(), 'prefix_hash': prefix_hash(file, state.offset),
+            'stats': stats.to_dict()}
+    if ended:
+        data['ended'] = True
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as otf:
+        json.dump(data, otf)
+    os.replace(tmp_path, path)
+
+
+def preprocess_incremental(file, path, segmentation, max_chars, vso_capacity,
+                           preprocess: Callable[[Iterable[str]], CorpusStats], boilerplate=False) -> CorpusStats:
+    """
+    the statistics of 'file', parsing ('preprocess') only the pieces of the paragraphs after the checkpoint 'path'.
+    the file is read as by read_paragraphs, and the checkpoint is saved where the last part of it starts (only white
+    space after the last line, see _read_parts): the text which is not split yet in the last paragraph is kept in
+    the checkpoint and parsed again in the next run, as the next lines may be appended to it. so a file without
+    blank lines is not parsed from its start again, and no paragraph is ever in memory as a whole. the statistics are
+    merged in file order, so the result is the same as parsing the whole file (with exact counts, i.e. no
+    vso_capacity).
+    with 'boilerplate' the header and the footer of Project Gutenberg are left out (see drop_boilerplate).
+    """
+    stats, state = load_checkpoint(path, file)
+    if state is None:
+        return stats
+    if stats is None:
+        stats = CorpusStats(vso_capacity)
+    checkpoint = [state]  # the state after the pieces parsed before the last part of the file
+    read = [state]  # the state after the parts read so far
+    rest = []  # the pieces of the last part of the file
+    footer = []  # the end line of Project Gutenberg, if it is reached
+
+    def pieces() -> Iterator[Tuple[str, bool]]:
+        # every piece and whether it is one of the last part of the file
+        with open_corpus(file) as infile:
+            infile.seek(state.offset)
+            previous = [], state
+            for item in read_pieces(infile, segmentation, max_chars=max_chars, state=state):
+                read[0] = item[1]
+                for piece in previous[0]:
+                    yield piece, False
+                checkpoint[0] = previous[1]
+                previous = item
+        for piece in previous[0]:
+            yield piece, True
+
+    def complete_pieces() -> Iterator[str]:
+        items = pieces()
+        if boilerplate:
+            items = drop_boilerplate(items, footer=footer)
+        for piece, last in items:
+            if last:
+                rest.append(piece)
+            else:
+                yield piece
+
+    stats.merge(preprocess(complete_pieces()))
+    if footer:
+        # nothing after the footer is ever parsed
+        save_checkpoint(path, file, stats, read[0], ended=True)
+        return stats
+    save_checkpoint(path, file, stats, checkpoint[0])
+    return stats.merge(preprocess(rest)) if rest else stats
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> collect the statistics of one run in an object instead of in class variables
+# 1. counts of named entities, verbs and VSO triples, sums of sentences, tokens and characters
+# 2. merge the statistics of shards, workers or files
+# 3. turn the statistics into plain lists and dicts (e.g. for json) and back
+# 4. an approximate counter with bounded memory (space-saving) for the candidate VSO triples
+# 5. compact counters: the strings of the keys are stored once in a string table, the keys are integer ids and the
+#    counts are an array, they are pickled (e.g. sent back by a pool process) as a few packed byte strings
+
+
+import heapq
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+# the rows of an InternedCounter are merged when there are this many, or twice as many as distinct keys
+COMPACT_ROWS = 1 << 16
+
+
+class CorpusStats:
+    """
+    The statistics of a corpus, or of a part of it (a paragraph, a shard, a file).
+    Every run has its own object, so several analyses can run in one process without disturbing each other.
+    The candidate VSO triples of all the verbs are counted in the same pass as the verbs, vso_counts only gets the
+    ones of the most common verbs at the end (see parsing_file.get_vso_one_file).
+    The counters share one string table (InternedCounter), so a subject, an entity or a verb is stored only once.
+    :param vso_capacity: keep at most this many candidate triples (SpaceSaving), None counts all of them exactly.
+    """
+
+    def __init__(self, vso_capacity=None):
+        self.strings = StringTable()
+        self.ner_counts = InternedCounter(self.strings, 2)
+        self.verb_counts = InternedCounter(self.strings, 1)
+        self.vso_counts = InternedCounter(self.strings, 3)
+        self.vso_candidates = SpaceSaving(vso_capacity) if vso_capacity else InternedCounter(self.strings, 3)
+        self.sent_sum = 0
+        self.token_sum = 0
+        self.char_sum = 0
+
+    def merge(self, other: 'CorpusStats') -> 'CorpusStats':
+        """
+        add the statistics of 'other' to this object and return it.
+        merging is associative, if 'other' follows this part in the text, the result is the same as collecting the
+        statistics in one go (including the order of ties in most_common).
+        """
+        # the ids of the strings of 'other' in the table of this object, worked out once for all the counters
+        ids = self.strings.merge(other.strings)
+        self.ner_counts.add(other.ner_counts, ids)
+        self.verb_counts.add(other.verb_counts, ids)
+        self.vso_counts.add(other.vso_counts, ids)
+        if isinstance(self.vso_candidates, InternedCounter):
+            self.vso_candidates.add(other.vso_candidates, ids)
+        else:
+            self.vso_candidates.update(other.vso_candidates, getattr(other.vso_candidates, 'errors', None))
+        self.sent_sum += other.sent_sum
+        self.token_sum += other.token_sum
+        self.char_sum += other.char_sum
+        return self
+
+    def to_dict(self) -> Dict:
+        """turn the statistics into plain lists and numbers, e.g. to dump them as json."""
+        return {
+            'ner_counts': _counter_to_list(self.ner_counts),
+            'verb_counts': _counter_to_list(self.verb_counts),
+            'vso_counts': _counter_to_list(self.vso_counts),
+            'vso_candidates': _counter_to_list(self.vso_candidates),
+            'vso_capacity': getattr(self.vso_candidates, 'capacity', None),
+            'vso_errors': _counter_to_list(getattr(self.vso_candidates, 'errors', {})),
+            'sent_sum': self.sent_sum,
+            'token_sum': self.token_sum,
+            'char_sum': self.char_sum,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CorpusStats':
+        """the reverse of to_dict."""
+        stats = cls(data['vso_capacity'])
+        stats.ner_counts.update(_list_to_counter(data['ner_counts']))
+        stats.verb_counts.update(_list_to_counter(data['verb_counts']))
+        stats.vso_counts.update(_list_to_counter(data['vso_counts']))
+        if isinstance(stats.vso_candidates, SpaceSaving):
+            stats.vso_candidates.update(_list_to_counter(data['vso_candidates']),
+                                        _list_to_counter(data.get('vso_errors', [])))
+        else:
+            stats.vso_candidates.update(_list_to_counter(data['vso_candidates']))
+        stats.sent_sum = data['sent_sum']
+        stats.token_sum = data['token_sum']
+        stats.char_sum = data['char_sum']
+        return stats
+
+
+class StringTable:
+    """
+    The strings of the keys of some counters, every string is stored once and has an id: its position in the table.
+    It is pickled as the utf-8 bytes of all the strings and an array of their lengths.
+    """
+
+    def __init__(self, strings: Iterable[str] = ()):
+        self.strings = []
+        self.ids = {}
+        for string in strings:
+            self.intern(string)
+
+    def intern(self, string: str) -> int:
+        """the id of 'string', which is added to the table if it is not in it yet."""
+        i = self.ids.get(string)
+        if i is None:
+            i = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+        return i
+
+    def merge(self, other: 'StringTable') -> Optional[List[int]]:
+        """add the strings of 'other' to this table and return their ids here, None if it is the same table."""
+        if other is self:
+            return None
+        return [self.intern(string) for string in other.strings]
+
+    def __getitem__(self, i: int) -> str:
+        return self.strings[i]
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __getstate__(self) -> Dict:
+        encoded = [string.encode('utf-8') for string in self.strings]
+        return {'lengths': array('I', map(len, encoded)).tobytes(), 'text': b''.join(encoded)}
+
+    def __setstate__(self, state: Dict) -> None:
+        lengths = array('I')
+        lengths.frombytes(state['lengths'])
+        text = state['text']
+        self.strings = []
+        start = 0
+        for length in lengths:
+            self.strings.append(text[start:start + length].decode('utf-8'))
+            start += length
+        self.ids = {string: i for i, string in enumerate(self.strings)}
+
+
+class InternedCounter(Mapping):
+    """
+    A compact counter of strings (width 1) or of tuples of 'width' strings, e.g. (text, label) of the named entities
+    or (verb, subject, object) of the VSO triples.
+    The strings are stored once in the string table 'strings', which several counters can share. A key is a row of
+    the ids of its strings in an array and the counts are another array, without a Python object per key: new keys
+    are appended and the rows are merged with numpy from time to time (see _compact), keeping the order the keys
+    first occur in, so most_common breaks ties like Counter. The keys are only turned back into strings when they are
+    asked for, e.g. by most_common for the output.
+    It supports the parts of Counter used here: update, items, most_common, [] and += and the Mapping methods, and it
+    compares equal to a Counter with the same counts. Pickling it (e.g. sending it back from a pool process) packs
+    the ids and the counts into byte strings of the smallest integer type they fit in.
+    """
+
+    def __init__(self, strings: StringTable = None, width=1):
+        self.strings = strings if strings is not None else StringTable()
+        self.width = width
+        self._ids = array('I')
+        self._counts = array('q')
+        # the number of rows which are distinct keys, the ones after them are not merged yet
+        self._distinct = 0
+        self._lookup = None
+
+    def _row(self, key) -> List[int]:
+        """the ids of the strings of 'key', which are added to the table if needed."""
+        if self.width == 1:
+            return [self.strings.intern(key)]
+        return [self.strings.intern(string) for string in key]
+
+    def _append(self, rows: array, counts: array) -> None:
+        self._ids.extend(rows)
+        self._counts.extend(counts)
+        self._lookup = None
+        if len(self._counts) >= max(2 * self._distinct, COMPACT_ROWS):
+            self._compact()
+
+    def _rows(self) -> np.ndarray:
+        return np.frombuffer(self._ids, dtype=np.uint32).reshape(-1, self.width)
+
+    def _compact(self) -> None:
+        """merge the rows of the same key, in the order the keys first occur."""
+        if self._distinct == len(self._counts):
+            return
+        rows = self._rows()
+        keys = np.ascontiguousarray(rows).view(np.dtype((np.void, 4 * self.width))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        sums = np.zeros(len(first), dtype=np.int64)
+        np.add.at(sums, inverse.ravel(), np.frombuffer(self._counts, dtype=np.int64))
+        order = np.argsort(first)
+        self._ids = array('I', rows[first[order]].tobytes())
+        self._counts = array('q', sums[order].tobytes())
+        self._distinct = len(self._counts)
+
+    def _key(self, row: List[int]):
+        """the key (of strings) of a row of ids."""
+        if self.width == 1:
+            return self.strings[row[0]]
+        return tuple(self.strings[i] for i in row)
+
+    def _slot(self, key) -> Optional[int]:
+        """the position of 'key' in the (merged) rows, None if it is not counted."""
+        self._compact()
+        ids = self.strings.ids
+        parts = [key] if self.width == 1 else key
+        if not isinstance(parts, (list, tuple)) or len(parts) != self.width:
+            return None
+        row = []
+        for part in parts:
+            i = ids.get(part)
+            if i is None:
+                return None
+            row.append(i)
+        if self._lookup is None:
+            self._lookup = {tuple(ids_of_key): slot for slot, ids_of_key in enumerate(self._rows().tolist())}
+        return self._lookup.get(tuple(row))
+
+    def update(self, keys: Union[Iterable, Dict]) -> None:
+        """count 'keys' like Counter.update: an iterable of keys, or a mapping from keys to counts."""
+        if isinstance(keys, InternedCounter):
+            self.add(keys, self.strings.merge(keys.strings))
+            return
+        pairs = keys.items() if hasattr(keys, 'items') else ((key, 1) for key in keys)
+        rows = array('I')
+        counts = array('q')
+        for key, number in pairs:
+            rows.extend(self._row(key))
+            counts.append(number)
+        self._append(rows, counts)
+
+    def add(self, other: 'InternedCounter', ids: Optional[List[int]]) -> None:
+        """
+        add the counts of 'other' (of the same width), 'ids' are the ids of the strings of its table in this table
+        (StringTable.merge), None if both use the same table.
+        """
+        if not other._counts:
+            return
+        rows = other._ids
+        if ids is not None:
+            rows = array('I', np.asarray(ids, dtype=np.uint32)[np.frombuffer(rows, dtype=np.uint32)].tobytes())
+        self._append(rows, other._counts)
+
+    def select(self, first: Iterable[str]) -> 'InternedCounter':
+        """the counts of the keys whose first string is in 'first', in the same order (e.g. the triples of verbs)."""
+        self._compact()
+        ids = [self.strings.ids[string] for string in first if string in self.strings.ids]
+        chosen = np.flatnonzero(np.isin(self._rows()[:, 0], np.asarray(ids, dtype=np.uint32)))
+        result = InternedCounter(self.strings, self.width)
+        result._append(array('I', self._rows()[chosen].tobytes()),
+                       array('q', np.frombuffer(self._counts, dtype=np.int64)[chosen].tobytes()))
+        return result
+
+    def __getitem__(self, key):
+        slot = self._slot(key)
+        return 0 if slot is None else self._counts[slot]
+
+    def __setitem__(self, key, number) -> None:
+        slot = self._slot(key)
+        if slot is None:
+            self._append(array('I', self._row(key)), array('q', [number]))
+        else:
+            self._counts[slot] = number
+
+    def __contains__(self, key):
+        return self._slot(key) is not None
+
+    def __iter__(self):
+        return (key for key, _ in self.items())
+
+    def __len__(self):
+        self._compact()
+        return len(self._counts)
+
+    def items(self):
+        self._compact()
+        return [(self._key(row), number) for row, number in zip(self._rows().tolist(), self._counts)]
+
+    def most_common(self, n=None) -> List[Tuple]:
+        """the same as Counter.most_common (ties in the order the keys first occur), only these keys are resolved."""
+        self._compact()
+        counts = np.frombuffer(self._counts, dtype=np.int64)
+        order = np.argsort(-counts, kind='stable')
+        if n is not None:
+            order = order[:max(n, 0)]
+        rows = self._rows()
+        return [(self._key(rows[slot].tolist()), int(counts[slot])) for slot in order.tolist()]
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self.most_common())!r})'
+
+    def __getstate__(self) -> Dict:
+        self._compact()
+        ids = np.frombuffer(self._ids, dtype=np.uint32)
+        counts = np.frombuffer(self._counts, dtype=np.int64)
+        id_type = np.min_scalar_type(len(self.strings))
+        count_type = np.min_scalar_type(int(counts.max())) if len(counts) and counts.min() >= 0 else np.int64
+        return {'strings': self.strings, 'width': self.width, 'id_type': id_type.str,
+                'count_type': np.dtype(count_type).str, 'ids': ids.astype(id_type).tobytes(),
+                'counts': counts.astype(count_type).tobytes()}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.strings = state['strings']
+        self.width = state['width']
+        self._ids = array('I', np.frombuffer(state['ids'], dtype=state['id_type']).astype(np.uint32).tobytes())
+        self._counts = array('q', np.frombuffer(state['counts'], dtype=state['count_type']).astype(np.int64).tobytes())
+        self._distinct = len(self._counts)
+        self._lookup = None
+
+
+class SpaceSaving:
+    """
+    An approximate counter which keeps at most 'capacity' keys (the space-saving algorithm of Metwally et al.).
+    When a new key comes in and the counter is full, the key with the lowest count is replaced and the new key takes
+    over its count, so counts are overestimated by at most the lowest count at that moment, and every key counted more
+    often than total/capacity times is guaranteed to be kept.
+    The count a key took over is its error: the key occurs at least count - error times (its guaranteed count, see
+    select), which is what the output shows. A key which was never counted in place of another one is exact.
+    It supports the parts of Counter used here: update, items, most_common, len and iteration.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # (count, sequence, key) entries, stale entries (the count has changed since) are skipped when evicting
+        self._heap = []
+        self._sequence = 0
+
+    def update(self, keys: Union[Iterable, Dict], errors: Optional[Dict] = None) -> None:
+        """
+        count 'keys' like Counter.update: an iterable of keys, or a mapping from keys to counts. 'errors' are the
+        errors of these counts, e.g. of another SpaceSaving when the statistics of two parts are merged.
+        """
+        pairs = keys.items() if hasattr(keys, 'items') else ((key, 1) for key in keys)
+        errors = errors or {}
+        for key, number in pairs:
+            error = errors.get(key, 0)
+            if key in self.counts:
+                self.counts[key] += number
+                self.errors[key] += error
+            elif len(self.counts) < self.capacity:
+                self.counts[key] = number
+                self.errors[key] = error
+            else:
+                replaced = self._pop_min()
+                self.errors.pop(replaced)
+                lowest = self.counts.pop(replaced)
+                self.counts[key] = number + lowest
+                self.errors[key] = error + lowest
+            self._sequence += 1
+            heapq.heappush(self._heap, (self.counts[key], self._sequence, key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(number, i, key) for i, (key, number) in enumerate(self.counts.items())]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        """the key with the lowest count."""
+        while True:
+            number, _, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == number:
+                return key
+
+    def items(self):
+        return self.counts.items()
+
+    def select(self, first: Iterable[str]) -> Counter:
+        """
+        the guaranteed counts (count - error) of the keys whose first string is in 'first', in the same order (e.g. the
+        triples of verbs).
+        """
+        first = set(first)
+        return Counter({key: number - self.errors[key] for key, number in self.counts.items() if key[0] in first})
+
+    def most_common(self, n=None) -> List[Tuple]:
+        return Counter(self.counts).most_common(n)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __iter__(self):
+        return iter(self.counts)
+
+
+def _counter_to_list(counter: Counter) -> List:
+    """[key, count] pairs in the order of the counter, tuple keys become lists."""
+    return [[list(key) if isinstance(key, tuple) else key, number] for key, number in counter.items()]
+
+
+def _list_to_counter(pairs: List) -> Counter:
+    """the reverse of _counter_to_list."""
+    return Counter({tuple(key) if isinstance(key, list) else key: number for key, number in pairs})
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> find out where the time of a run goes
+# 1. named timers and counters of the stages (spaCy, Preprocessor, NER, verbs, VSO, waiting for the pool, ...)
+# 2. one set of them per process, sent back with the results and added up in the main process
+# 3. a summary for the command line (--stats)
+# 4. a cProfile dump per process (--profile)
+# 5. every task records into its own set, which is passed down to the stages and set for the timed functions
+
+
+import cProfile
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List
+
+
+class Instruments:
+    """
+    Named timers (seconds) and counters of a process, or of several processes added up (see merge).
+    The timers of nested stages overlap, e.g. 'get_verb' is a part of 'Preprocessor.update_stats'.
+    """
+
+    def __init__(self):
+        self.timers = Counter()
+        self.counters = Counter()
+
+    @contextmanager
+    def timer(self, name):
+        """add the time spent in the with-block to the timer 'name'."""
+        t = perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] += perf_counter() - t
+
+    def count(self, name, number=1) -> None:
+        """add 'number' to the counter 'name'."""
+        self.counters[name] += number
+
+    def timed_iter(self, name, iterable: Iterable) -> Iterator:
+        """yield the items of 'iterable', adding the time spent waiting for each of them to the timer 'name'."""
+        iterator = iter(iterable)
+        while True:
+            t = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.timers[name] += perf_counter() - t
+                return
+            self.timers[name] += perf_counter() - t
+            yield item
+
+    def reset(self) -> None:
+        """start again from zero (e.g. at the beginning of a task of a pool process)."""
+        self.timers.clear()
+        self.counters.clear()
+
+    def merge(self, other: 'Instruments') -> 'Instruments':
+        """add the timers and counters of 'other' (e.g. of another process) to this object and return it."""
+        self.timers.update(other.timers)
+        self.counters.update(other.counters)
+        return self
+
+    def to_dict(self) -> Dict:
+        """plain dicts, small enough to be sent back with the results of a task."""
+        return {'timers': dict(self.timers), 'counters': dict(self.counters)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Instruments':
+        """the reverse of to_dict."""
+        instruments = cls()
+        instruments.timers.update(data['timers'])
+        instruments.counters.update(data['counters'])
+        return instruments
+
+    def summary(self) -> List[str]:
+        """the lines of the --stats output: the counters, then the timers, the slowest first."""
+        lines = [f"{name:<24}{number:>12}" for name, number in sorted(self.counters.items())]
+        lines += [f"{name:<24}{seconds:>11.3f}s" for name, seconds in self.timers.most_common()]
+        return lines
+
+
+# the timers and counters of this process outside of the tasks, and the ones of the running task (see recording)
+_instruments = Instruments()
+_recording = ContextVar('instruments', default=None)
+_profiler = None
+
+
+def get_instruments() -> Instruments:
+    """the timers and counters of the running task (see recording), otherwise the ones of this process."""
+    return _recording.get() or _instruments
+
+
+@contextmanager
+def recording(instruments: Instruments):
+    """
+    record into 'instruments' in the with-block: a task (e.g. analysing a file in a pool process) makes its own
+    Instruments, passes them down to the stages it calls and sets them here for the timed functions below them. so
+    the timers and counters sent back with its results do not depend on the tasks run before it in the same process
+    (or at the same time in another thread), and none are left in the process after it.
+    """
+    token = _recording.set(instruments)
+    try:
+        yield instruments
+    finally:
+        _recording.reset(token)
+
+
+def timed(name):
+    """decorator: add the time spent in every call of the function to the timer 'name' (see get_instruments)."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            t = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                get_instruments().timers[name] += perf_counter() - t
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def profiled(profile_dir=None):
+    """
+    profile the with-block with cProfile if 'profile_dir' is given. the profile of a process is kept over all its
+    tasks and dumped after each of them into 'profile_dir'/process-<pid>.pstats (one file per worker), to be read
+    with pstats or turned into a flame graph (e.g. with flameprof or snakeviz).
+    """
+    global _profiler
+    if not profile_dir:
+        yield
+        return
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+    _profiler.enable()
+    try:
+        yield
+    finally:
+        _profiler.disable()
+        os.makedirs(profile_dir, exist_ok=True)
+        _profiler.dump_stats(os.path.join(profile_dir, f'process-{os.getpid()}.pstats'))
@@ -18,14 +18,25 @@
 
 # Task --> getting triples of the form verb-subject-object for the three most common verbs
 # 1. Make command line interface,
-# 2. which can take two files as input files and parse them.
-# 3. print the metadata into command line or into a html file.
+# 2. which can take two (or any number of) files as input files and parse them.
+# 3. print the metadata into command line or into a html file (see output_sinks.py), file by file as they are done.
+# 4. optionally print where the time went (--stats) and profile the processes (--profile).
 
 import sys
-from parsing_file import preprocess_one_file, get_vso_one_file, clear_up_data
+import os
+from glob import glob
+from parsing_file import analyse_one_file, analyse_one_file_sharded, peak_rss, BATCH_SIZE, FileReport
+from output_sinks import OutputSink, TerminalSink, HtmlSink, export_sink, JSON_EXTENSIONS, TABLE_EXTENSIONS
+from models import DEFAULT_MODEL, LEXICAL_COMPONENTS
+from paragraph_sentence_gen import SEGMENTATION, DEFAULT_SEGMENTATION, MAX_PARA_CHARS
+from parse_cache import CACHE_SIZE_MB
+from paragraph_memo import MEMO_SIZE
+from instrumentation import Instruments
+from sampling import analyse_one_sample, SAMPLE_METHODS
 from argparse import ArgumentParser
 import time
-from typing import List, TextIO, Tuple
+from itertools import starmap
+from typing import Callable, Iterator, List, Tuple
 from multiprocessing import Pool
 
 
@@ -36,6 +47,11 @@ IN_FILE_2 = 'data/Politics.txt'
 def get_cli() -> ArgumentParser:
     """Command line interface that allows the user to compare text files and print the metadata."""
     parser = ArgumentParser("VSO", description="Parse given files, get metadata and VSO triples.")
+    parser.add_argument('files', nargs='*', metavar='FILE',
+                        help="Any number of files to be compared (plain text, or gzip or bz2 compressed), a directory "
+                             "stands for all the .txt(.gz/.bz2) files in it and "
+                             "glob patterns (e.g. 'data/*.txt') are expanded. Without them --file_1 and --file_2 are "
+                             "compared.")
     parser.add_argument('--file_1', '-f1', default=IN_FILE_1, metavar='FILE', type=str,
                         help="The two files to be compared.")
     parser.add_argument('--file_2', '-f2', default=IN_FILE_2, metavar='FILE', type=str,
@@ -49,137 +65,265 @@ def get_cli() -> ArgumentParser:
                         help="The number of the most common VSO triples to be printed.")
     parser.add_argument('--output_file', '-o', type=str, default=sys.stdout, metavar='FILE',
                         help="Write the metadata of comparing two text files out.")
+    parser.add_argument('--batch-size', '-b', type=int, default=BATCH_SIZE,
+                        help="The number of paragraphs spaCy parses together in one batch.")
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help="The number of processes spaCy uses for parsing one file. With more than one worker the "
+                             "files are parsed one after the other, each of them using all the workers.")
+    parser.add_argument('--shard-size', '-s', type=int, default=0,
+                        help="Split every file into shards of this many paragraphs and parse the shards with a pool "
+                             "of --workers processes (all cores if --workers is 1). 0 means no sharding.")
+    parser.add_argument('--max-candidates', '-c', type=int, default=0,
+                        help="Keep at most this many candidate VSO triples per file, counted approximately with "
+                             "bounded memory (space-saving). A count may be too high by at most the number of "
+                             "candidates divided by N, so the triples are ranked and shown by their guaranteed count "
+                             "(a lower bound). 0 counts all of them exactly.")
+    parser.add_argument('--model', '-m', type=str, default=DEFAULT_MODEL,
+                        help="The spaCy model (package name or path) to parse the files with.")
+    parser.add_argument('--cache-dir', type=str, default=None, metavar='DIR',
+                        help="Keep the parse results of every file in this directory, so a file parsed before (with "
+                             "the same model and settings) is not parsed again.")
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE_MB, metavar='MB',
+                        help="The size limit of the parse cache, the least recently used files are removed first.")
+    parser.add_argument('--segmentation', choices=sorted(SEGMENTATION), default=DEFAULT_SEGMENTATION,
+                        help="How the files are split into paragraphs: at blank lines (hard wrapped text, e.g. "
+                             "Gutenberg) or at every line break (soft wrapped text).")
+    parser.add_argument('--checkpoint-dir', type=str, default=None, metavar='DIR',
+                        help="Keep the statistics of every file and how far it was parsed in this directory, so for a "
+                             "file which has grown since (e.g. a log) only the new paragraphs are parsed.")
+    parser.add_argument('--max-para-chars', type=int, default=MAX_PARA_CHARS, metavar='N',
+                        help="Split paragraphs longer than this many characters (e.g. of a text without blank lines) "
+                             "at the ends of sentences before parsing them. 0 means no limit.")
+    parser.add_argument('--lexical', nargs='*', choices=sorted(LEXICAL_COMPONENTS), default=None, metavar='METRIC',
+                        help="Fast mode: only split the paragraphs into tokens and sentences (a rule-based "
+                             "sentencizer instead of the parser) for the average word and sentence length, and count "
+                             "only the metrics given here: 'ents' (named entities), 'verbs'. No VSO triples.")
+    parser.add_argument('--dedup', type=int, nargs='?', const=MEMO_SIZE, default=0, metavar='N',
+                        help="Do not parse a paragraph again and again (boilerplate, mastheads, captions): keep the "
+                             f"statistics of the last N repeated paragraphs (default {MEMO_SIZE}) of every process "
+                             "for their next repeats, with --cache-dir also on disk for other files and runs. The "
+                             "results stay the same.")
+    parser.add_argument('--drop-boilerplate', action='store_true',
+                        help="Leave out the header and the footer (the license) of Project Gutenberg ebooks.")
+    parser.add_argument('--sample', type=int, default=0, metavar='N',
+                        help="Only parse a random sample of N paragraphs of every file, for a quick approximate "
+                             "comparison with confidence intervals for the averages and the stability of the most "
+                             "common entities and verbs. 0 parses the whole files. It cannot be combined with the "
+                             "parse cache, checkpoints, --dedup, --profile or several workers or shards.")
+    parser.add_argument('--sample-method', choices=SAMPLE_METHODS, default=SAMPLE_METHODS[0],
+                        help="Sample the paragraphs uniformly (reservoir) or one from each of N equal parts of the "
+                             "file (stratified).")
+    parser.add_argument('--seed', type=int, default=0, help="The random seed of the sample and of the bootstrap.")
+    parser.add_argument('--export', action='append', default=[], metavar='FILE',
+                        help="Also write the results in a machine readable format, chosen by the extension of the "
+                             f"file: {', '.join(JSON_EXTENSIONS + TABLE_EXTENSIONS)} (parquet and arrow need "
+                             "pyarrow, otherwise csv is written). Can be given several times.")
+    parser.add_argument('--stream', action='store_true',
+                        help="Write every row of the html table as soon as the file (and all the files before it) is "
+                             "analysed, instead of writing the whole table at the end.")
+    parser.add_argument('--stats', action='store_true',
+                        help="Print the documents, tokens, cache hits and the time of every stage, added up over all "
+                             "the processes.")
+    parser.add_argument('--profile', type=str, default=None, metavar='DIR',
+                        help="Profile every analysing process with cProfile and write one pstats file per process "
+                             "into this directory.")
     return parser
 
 
-def pretty_print(w_len: float, s_len: float, top_e: Tuple, top_v: Tuple, vso_triple: List[Tuple]) -> None:
+def sample_conflicts(args) -> List[str]:
+    """The options given on the command line which the --sample mode does not support (see analyse_files)."""
+    options = [('--cache-dir', args.cache_dir), ('--checkpoint-dir', args.checkpoint_dir), ('--dedup', args.dedup),
+               ('--workers', args.workers > 1), ('--shard-size', args.shard_size > 0), ('--profile', args.profile)]
+    return [option for option, given in options if given]
+
+
+def collect_files(patterns: List[str]) -> List[str]:
     """
-    Print the outputs of comparing two files into the screen, with data for average word length, average sentence
-    length, most common named entities, most common verbs, most common vso chunks.
+    The files to be compared: a directory stands for all the .txt files in it (also compressed: .txt.gz, .txt.bz2), a
+    glob pattern for the files it matches (both sorted by name), everything else is taken as a file name.
+    A ValueError names the files which do not exist and the directories and patterns without any file, before any of
+    them is analysed.
     """
-    print(f"Average word length: {w_len}")
-    print(f"Average sentence length: {s_len}")
-    print("-" * 40)
-    print(f"Most common {len(top_e)} named entities: ")
-    for key, value in top_e:
-        print(key, "-->", value)
-    print("-" * 40)
-    print(f"Most common {len(top_v)} verbs: ")
-    for key, value in top_v:
-        print(key, "-->", value)
-    print("-" * 40)
-    print(f"Most common {len(vso_triple)} VSO triples: ")
-    for key, value in vso_triple:
-        print(key, "-->", value)
-    clear_up_data()
-    print()
-
-
-def write_html_body(args_html: Tuple) -> None:
+    files = []
+    missing = []
+    empty = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(file for extension in ('*.txt', '*.txt.gz', '*.txt.bz2')
+                             for file in glob(os.path.join(pattern, extension)))
+        elif any(char in pattern for char in '*?['):
+            matches = sorted(glob(pattern))
+        elif os.path.isfile(pattern):
+            matches = [pattern]
+        else:
+            missing.append(pattern)
+            continue
+        if not matches:
+            empty.append(pattern)
+        files.extend(matches)
+    errors = []
+    if missing:
+        errors.append(f"no such file: {', '.join(missing)}")
+    if empty:
+        errors.append(f"no files in: {', '.join(empty)}")
+    if errors:
+        raise ValueError('; '.join(errors))
+    return files
+
+
+def call_indexed(task: Tuple) -> Tuple[int, object]:
+    """call a function of a Pool task, task = (index, func, args), and return the result with its index."""
+    i, func, args = task
+    return i, func(*args)
+
+
+def imap_stage(func: Callable, args_list: List[Tuple], workers: int) -> Iterator[Tuple[int, object]]:
     """
-    Write the comparison of two files into html table.
-    Data for one file stays in one row.
-    Data includes average word length, average sentence length, most common named entities, most common verbs,
-    most common vso chunks
+    Call 'func' on the arguments of every file and yield (index, result) as soon as a file is done.
+    With a single spaCy worker the files are handled in parallel by a Pool, one task at a time per process, so a
+    process which is done takes the next file in the list. Otherwise the files are handled one after the other and
+    nlp.pipe spreads each of them over the workers (the processes of a Pool are daemonic and may not start the
+    nlp.pipe processes themselves).
     """
-    file, outfile, w_len, s_len, top_e, top_v, vso_triple = args_html
-    with open(outfile, 'a', encoding='utf-8') as otf:
-        otf.write('     <tr> ')
-        filename = file.split('/')[1][:-4]
-        otf.write(f'<td>{filename}</td>')
-        otf.write(f'<td>{w_len}</td>')
-        otf.write(f'<td>{s_len}</td>')
-        otf.write('<td>')
-        for key, value in top_e:
-            otf.write(f'{key} --> {value}<br />')
-        otf.write('</td>')
-        otf.write('<td>')
-        for key, value in top_v:
-            otf.write(f'{key} --> {value}<br />')
-        otf.write('</td>')
-        otf.write('<td>')
-        for key, value in vso_triple:
-            otf.write(f'{key} --> {value}<br />')
-        otf.write('</td>')
-        otf.write('\n')
-        otf.write('     </tr>')
-        clear_up_data()
-
-
-def write_html_head(files: List, max_e: int, max_v: int, max_tr: int, otf: TextIO) -> None:
+    if workers > 1:
+        yield from enumerate(starmap(func, args_list))
+        return
+    with Pool(min(len(args_list), os.cpu_count() or 1)) as pool:
+        yield from pool.imap_unordered(call_indexed, [(i, func, args) for i, args in enumerate(args_list)])
+
+
+def run_stage(func: Callable, args_list: List[Tuple], workers: int) -> List:
+    """Call 'func' on the arguments of every file (see imap_stage), the results in the order of 'args_list'."""
+    results = [None] * len(args_list)
+    for i, result in imap_stage(func, args_list, workers):
+        results[i] = result
+    return results
+
+
+def largest_first(files: List[str]) -> List[int]:
     """
-    Write the head and title etc. for the html file and the table in it.
+    The indices of the files, the largest file first. Handing out the largest files first keeps the processes
+    busy until the end, instead of one process starting the largest file when the others are almost done.
     """
-    f1 = files[0].split('/')[1][:-4]
-    f2 = files[1].split('/')[1][:-4]
-    otf.write('<html>')
-    otf.write(f' <head><title>Compare Corpora: {f1} VS. {f2}</title></head>')
-    otf.write(' <body>')
-    otf.write(f'  <h1>Compare Corpora: {f1} VS. {f2}</h1>')
-    otf.write(f'  <h2>Only {max_tr} examples are presented for VSO triples! Otherwise it is too full.</h2>')
-    otf.write('  <table border = "5">')
-    otf.write(f'<tr><th>book</th><th>avg_word_len</th><th>avg_sent_len</th><th>top{max_e}_ent</th><th>top{max_v}_verb</th><th>\
-    top{max_tr}_VSO_triples</th></tr>')
-
-
-def write_html_end(otf: TextIO) -> None:
+    return sorted(range(len(files)), key=lambda i: os.path.getsize(files[i]), reverse=True)
+
+
+def analyse_files(args, files: List[str]) -> Iterator[FileReport]:
     """
-    Write the ending for the html table.
+    Analyse all the files, either one process per file (see imap_stage), the largest files first, or, with
+    --shard-size, by splitting every file into shards which keep all the processes of one pool busy.
+    Every file is analysed completely where it is parsed, only the compact results come back (see analyse_one_file).
+    The reports are yielded in the order of the files, each one as soon as it and all the files before it are done.
+    With --sample only a sample of the paragraphs of every file is parsed (see sampling.analyse_one_sample).
     """
-    otf.write('  </table>')
-    otf.write(' </body>')
-    otf.write('</html>')
+    if args.sample > 0:
+        order = largest_first(files)
+        args_tuple = [(files[i], args.max_ent, args.max_verb, args.max_triple, args.sample, args.sample_method,
+                       args.seed, args.batch_size, args.max_candidates or None, args.model, args.segmentation,
+                       args.max_para_chars, args.lexical, args.drop_boilerplate) for i in order]
+        yield from in_file_order(order, imap_stage(analyse_one_sample, args_tuple, 1))
+        return
+    if args.shard_size > 0:
+        with Pool(args.workers if args.workers > 1 else None) as pool:
+            for file in files:
+                yield analyse_one_file_sharded(file, args.max_ent, args.max_verb, args.max_triple, pool,
+                                               args.shard_size, args.batch_size, args.max_candidates or None,
+                                               args.model, args.cache_dir, args.cache_size, args.profile,
+                                               args.segmentation, args.max_para_chars, args.checkpoint_dir,
+                                               args.lexical, args.dedup, args.drop_boilerplate)
+        return
+    order = largest_first(files)
+    args_tuple = [(files[i], args.max_ent, args.max_verb, args.max_triple, args.batch_size, args.workers,
+                   args.max_candidates or None, args.model, args.cache_dir, args.cache_size, args.profile,
+                   args.segmentation, args.max_para_chars, args.checkpoint_dir, args.lexical, args.dedup,
+                   args.drop_boilerplate) for i in order]
+    yield from in_file_order(order, imap_stage(analyse_one_file, args_tuple, args.workers))
 
 
-def main():
-    parser = get_cli()
-    args = parser.parse_args()
-    files = [args.file_1, args.file_2]
-    # for multiprocessing. Better to use starmap which is more professional.
-    # I choose to use this naive way to pass multiple arguments to a function once.
-    # The first argument will change according to files. The second and third stay the same.
-    args_tuple = [(args.file_1, args.max_ent, args.max_verb), (args.file_2, args.max_ent, args.max_verb)]
+def in_file_order(order: List[int], results: Iterator[Tuple[int, FileReport]]) -> Iterator[FileReport]:
+    """
+    the reports of the files handed out in 'order' (see largest_first), as (index, report) in the order they are
+    done, put back into the order of the files. the report of a file waits until all the files before it are done.
+    """
+    done = {}
+    next_file = 0
+    for j, report in results:
+        done[order[j]] = report
+        while next_file in done:
+            yield done.pop(next_file)
+            next_file += 1
 
-    t1 = time.time()
 
+def get_sinks(args) -> List[OutputSink]:
+    """The output formats asked for on the command line."""
+    sinks = []
     # If we need to print to the screen
     if args.output_file == sys.stdout or args.print:
-        print("* I am working hard ... Be patient please :-) *")
-        # Use multiprocessing, parse two files together
-        with Pool() as pool:
-            # Call on the function 'preprocess_one_file'. Pass the arguments tuple. Deal with two files.
-            rt = pool.map(preprocess_one_file, args_tuple)
-            # Get the first stage results. Pick the ones we will use as arguments for next function. Make them a tuple.
-            args_vso = [(rt[0][4], rt[0][3], args.max_triple), (rt[1][4], rt[1][3], args.max_triple)]
-            # Call on the function 'get_vso_one_file'. Pass the argument tuple from above. Deal with two files.
-            vso_rt = pool.map(get_vso_one_file, args_vso)
-
-            # For the two files, print the results.
-            print("** Working on : ", args.file_1.split('/')[1], "**")
-            pretty_print(rt[0][0], rt[0][1], rt[0][2], rt[0][3], vso_rt[0])
-            print("** Working on : ", args.file_2.split('/')[1], "**")
-            pretty_print(rt[1][0], rt[1][1], rt[1][2], rt[1][3], vso_rt[1])
-
+        sinks.append(TerminalSink())
     # If we need to write to a html file to store the results in a table
     if args.output_file != sys.stdout:
-        # write the head
-        with open(args.output_file, 'w', encoding='utf-8') as otf:
-            write_html_head(files, args.max_ent, args.max_verb, args.max_triple, otf)
-        # Parse the two files as in last part, using multiprocessing.
-        # Write the results to the body of the html table, also using multiprocessing to write faster.
-        with Pool() as pool:
-            rt = pool.map(preprocess_one_file, args_tuple)
-            args_vso = [(rt[0][4], rt[0][3], args.max_triple), (rt[1][4], rt[1][3], args.max_triple)]
-            vso_rt = pool.map(get_vso_one_file, args_vso)
-            args_html = [(args.file_1, args.output_file, rt[0][0], rt[0][1], rt[0][2], rt[0][3], vso_rt[0]),
-                         (args.file_2, args.output_file, rt[1][0], rt[1][1], rt[1][2], rt[1][3], vso_rt[1])]
-            pool.map(write_html_body, args_html)
-        # Write the ending of the html file/table.
-        with open(args.output_file, 'a', encoding='utf-8') as otf:
-            write_html_end(otf)
+        sinks.append(HtmlSink(args.output_file, args.max_ent, args.max_verb, args.max_triple, args.stream))
+    # machine readable formats, e.g. for dashboards
+    sinks.extend(export_sink(outfile) for outfile in args.export)
+    return sinks
+
+
+def main():
+    parser = get_cli()
+    args = parser.parse_args()
+    try:
+        files = collect_files(args.files or [args.file_1, args.file_2])
+    except ValueError as error:
+        parser.error(str(error))
+    if not files:
+        parser.error("no files to compare")
+    if args.sample > 0 and sample_conflicts(args):
+        parser.error(f"--sample cannot be combined with {', '.join(sample_conflicts(args))}")
+    try:
+        sinks = get_sinks(args)
+    except ValueError as error:
+        parser.error(str(error))
+
+    t1 = time.time()
+
+    print("* I am working hard ... Be patient please :-) *")
+    # Use multiprocessing, parse the files together (or each file with several spaCy workers, or in shards)
+    # Every file is analysed once, whatever number of output formats are asked for.
+    # The results of every file are handed to all the output formats as soon as they come, in the order of the files.
+    output = Instruments()
+    reports = []
+    with output.timer('output'):
+        for sink in sinks:
+            sink.start(files)
+    for report in analyse_files(args, files):
+        reports.append(report)
+        with output.timer('output'):
+            for sink in sinks:
+                sink.write(report)
+    with output.timer('output'):
+        for sink in sinks:
+            sink.close()
 
     t2 = time.time()
     print("time:", t2-t1)
+    print("peak RSS (MB): main process", peak_rss(), "| analysing processes", max(r.peak_rss for r in reports),
+          "| largest worker process", peak_rss(children=True))
+    if args.cache_dir:
+        cache_status = [r.cache_status for r in reports]
+        print("parse cache:", cache_status.count('hit'), "hits,", cache_status.count('miss'), "misses")
+    if args.stats:
+        print_stats(reports, output)
+
+
+def print_stats(reports: List[FileReport], output: Instruments):
+    """print the timers and counters of all the files (added up over the processes) and of the output."""
+    total = Instruments()
+    for report in reports:
+        total.merge(Instruments.from_dict(report.instruments))
+    total.merge(output)
+    print("* statistics of the run (the times of nested stages overlap) *")
+    for line in total.summary():
+        print(line)
 
 
 if __name__ == "__main__":
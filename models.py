@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> load the spaCy models lazily, once per process
+# 1. load a model on first use and keep it for the rest of the process
+# 2. the components each stage can switch off because it does not need them
+# 3. a lexical pipeline: the tokenizer and a rule-based sentencizer, and only the components the metrics asked for need
+
+
+DEFAULT_MODEL = "en_core_web_sm"
+
+# components a stage on its own does not need, to be passed as 'disable' to nlp() or nlp.pipe(); the main analysis
+# counts everything from one Doc and runs the whole pipeline
+# the VSO triples only need the dependencies, noun chunks and lemmas
+VSO_DISABLE = ("ner",)
+# the sentence boundaries come from the parser alone
+SENT_DISABLE = ("tagger", "attribute_ruler", "lemmatizer", "ner")
+
+# the lexical pipeline only keeps the components the metrics need (e.g. --lexical ents verbs)
+LEXICAL_COMPONENTS = {
+    'ents': ('ner',),
+    'verbs': ('tok2vec', 'tagger', 'attribute_ruler', 'lemmatizer'),
+}
+# all the components of the English pipelines, the ones not needed are not even loaded
+PIPELINE_COMPONENTS = ('tok2vec', 'tagger', 'parser', 'senter', 'attribute_ruler', 'lemmatizer', 'ner')
+
+_models = {}
+
+
+def get_nlp(name=DEFAULT_MODEL):
+    """
+    get the spaCy model 'name', it is loaded on first use and then shared by all the modules of this process
+    (e.g. a Pool worker loads it once, for its first task). spaCy itself is only imported here, so the command line
+    interface starts without it.
+    """
+    if name not in _models:
+        import spacy
+        _models[name] = spacy.load(name)
+    return _models[name]
+
+
+def get_lexical_nlp(name=DEFAULT_MODEL, metrics=()):
+    """
+    the lexical pipeline of the model 'name': the tokenizer and a rule-based sentencizer, which give the numbers of
+    tokens, characters and sentences, and only the components the 'metrics' need (see LEXICAL_COMPONENTS: 'ents' for
+    the named entities, 'verbs' for the verbs). it is loaded once per process and set of metrics, like get_nlp.
+    """
+    key = (name, 'lexical') + tuple(sorted(set(metrics)))
+    if key not in _models:
+        import spacy
+        keep = {component for metric in metrics for component in LEXICAL_COMPONENTS[metric]}
+        nlp = spacy.load(name, exclude=[component for component in PIPELINE_COMPONENTS if component not in keep])
+        nlp.add_pipe('sentencizer', first=True)
+        _models[key] = nlp
+    return _models[key]
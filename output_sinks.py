@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> write the results of the analysed files out
+# 1. print them to the screen
+# 2. write them into a html table
+# 3. output sinks, which get the results of every file once, so adding an output format never parses a file again
+# 4. render the html table as strings and write it at once, or row by row as the files are done
+# 5. machine readable formats for dashboards and diffs: json (lines) and tables (parquet, arrow or csv), written
+#    file by file
+
+import csv
+import json
+import os
+import sys
+from typing import Dict, List, Tuple
+from parsing_file import FileReport
+
+
+# up to this many corpus names are listed in the title of the html file
+MAX_TITLE_NAMES = 4
+
+# how an average is shown for a file without any words or sentences (see computer_average)
+MISSING = '\u2013'
+
+# the columns of the table formats, one row per file; the most common entities, verbs and vso triples are lists
+TABLE_COLUMNS = ['file', 'corpus', 'avg_word_len', 'avg_sent_len', 'entities', 'entity_labels', 'entity_counts',
+                 'verbs', 'verb_counts', 'vso_verbs', 'vso_subjects', 'vso_objects', 'vso_counts']
+LIST_COLUMNS = TABLE_COLUMNS[4:]
+# the file extensions of the machine readable formats (see export_sink)
+JSON_EXTENSIONS = ('.json', '.jsonl', '.ndjson')
+TABLE_EXTENSIONS = ('.csv', '.parquet', '.arrow', '.feather')
+# the rows of this many files are written together into a parquet row group or an arrow record batch
+ROW_GROUP_SIZE = 1000
+
+
+def corpus_name(file: str) -> str:
+    """The name of a corpus in the output: the file name without directory and extension (e.g. .txt.gz)."""
+    name = os.path.basename(file)
+    if name.endswith(('.gz', '.bz2')):
+        name = os.path.splitext(name)[0]
+    return os.path.splitext(name)[0]
+
+
+def show(average) -> str:
+    """an average for the screen or the html table, MISSING if the file has no words or sentences."""
+    return MISSING if average is None else str(average)
+
+
+def pretty_print(w_len: float, s_len: float, top_e: Tuple, top_v: Tuple, vso_triple: List[Tuple]) -> None:
+    """
+    Print the outputs of comparing the files into the screen, with data for average word length, average sentence
+    length, most common named entities, most common verbs, most common vso chunks.
+    """
+    print(f"Average word length: {show(w_len)}")
+    print(f"Average sentence length: {show(s_len)}")
+    print("-" * 40)
+    print(f"Most common {len(top_e)} named entities: ")
+    for key, value in top_e:
+        print(key, "-->", value)
+    print("-" * 40)
+    print(f"Most common {len(top_v)} verbs: ")
+    for key, value in top_v:
+        print(key, "-->", value)
+    print("-" * 40)
+    print(f"Most common {len(vso_triple)} VSO triples: ")
+    for key, value in vso_triple:
+        print(key, "-->", value)
+    print()
+
+
+def print_sample(sample: Dict) -> None:
+    """
+    Print how far the results of a sampled file can be trusted: the confidence intervals of the averages, and how
+    often the most common entities and verbs stay in the top list when the sample is resampled.
+    """
+    level = int(sample['confidence'] * 100)
+    print(f"Sample ({sample['method']}, seed {sample['seed']}): {sample['paragraphs']} of {sample['population']} "
+          f"paragraphs")
+    print(f"Average word length, {level}% confidence interval: {sample['avg_word_len_ci']}")
+    print(f"Average sentence length, {level}% confidence interval: {sample['avg_sent_len_ci']}")
+    print("Stability of the named entities (share of resamples in the top list): ",
+          ', '.join(f'{key}: {share}' for key, share in sample['ent_stability']))
+    print("Stability of the verbs (share of resamples in the top list): ",
+          ', '.join(f'{key}: {share}' for key, share in sample['verb_stability']))
+    print()
+
+
+def render_html_row(file, w_len: float, s_len: float, top_e: Tuple, top_v: Tuple, vso_triple: List[Tuple]) -> str:
+    """
+    The html table row with the comparison data of one file: average word length, average sentence length, most common
+    named entities, most common verbs, most common vso chunks.
+    """
+    cells = [corpus_name(file), show(w_len), show(s_len),
+             ''.join(f'{key} --> {value}<br />' for key, value in top_e),
+             ''.join(f'{key} --> {value}<br />' for key, value in top_v),
+             ''.join(f'{key} --> {value}<br />' for key, value in vso_triple)]
+    return '     <tr> ' + ''.join(f'<td>{cell}</td>' for cell in cells) + '\n     </tr>'
+
+
+def render_html_head(files: List, max_e: int, max_v: int, max_tr: int) -> str:
+    """
+    The head and title etc. for the html file and the table in it.
+    """
+    names = [corpus_name(file) for file in files]
+    title = ' VS. '.join(names) if len(names) <= MAX_TITLE_NAMES else f'{len(names)} corpora'
+    return ('<html>'
+            f' <head><title>Compare Corpora: {title}</title></head>'
+            ' <body>'
+            f'  <h1>Compare Corpora: {title}</h1>'
+            f'  <h2>Only {max_tr} examples are presented for VSO triples! Otherwise it is too full.</h2>'
+            '  <table border = "5">'
+            '<tr><th>book</th><th>avg_word_len</th><th>avg_sent_len</th>'
+            f'<th>top{max_e}_ent</th><th>top{max_v}_verb</th><th>    top{max_tr}_VSO_triples</th></tr>')
+
+
+# the ending for the html table
+HTML_END = '  </table> </body></html>'
+
+
+def render_html(reports: List[FileReport], max_e: int, max_v: int, max_tr: int) -> str:
+    """The whole html file with one row per report, in the order of the reports."""
+    rows = [render_html_row(report.file, report.avg_word_len, report.avg_sent_len, report.top_ent, report.top_verb,
+                            report.vso_triples) for report in reports]
+    return render_html_head([report.file for report in reports], max_e, max_v, max_tr) + ''.join(rows) + HTML_END
+
+
+class OutputSink:
+    """
+    An output format. main analyses every file once and hands the same FileReport objects to all the sinks:
+    start is called with the list of files, then write for every file in that order, then close.
+    """
+
+    def start(self, files: List[str]) -> None:
+        pass
+
+    def write(self, report: FileReport) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class TerminalSink(OutputSink):
+    """Print the results to the screen (see pretty_print)."""
+
+    def write(self, report: FileReport) -> None:
+        cache_note = f"(parse cache {report.cache_status})" if report.cache_status else ""
+        print("** Working on : ", os.path.basename(report.file), "**", cache_note)
+        pretty_print(report.avg_word_len, report.avg_sent_len, report.top_ent, report.top_verb, report.vso_triples)
+        if report.sample:
+            print_sample(report.sample)
+
+
+class HtmlSink(OutputSink):
+    """
+    Write the results into a html table in 'outfile', one row per file, in the order the reports are written.
+    The rows are rendered as strings and the whole file is written at once when the sink is closed. With 'stream' the
+    head is written at the start and every row as soon as its report comes (the table is complete after close).
+    """
+
+    def __init__(self, outfile: str, max_e: int, max_v: int, max_tr: int, stream=False):
+        self.outfile = outfile
+        self.max_e = max_e
+        self.max_v = max_v
+        self.max_tr = max_tr
+        self.stream = stream
+        self.parts = []
+        self.otf = None
+
+    def start(self, files: List[str]) -> None:
+        self.parts = [render_html_head(files, self.max_e, self.max_v, self.max_tr)]
+        if self.stream:
+            self.otf = open(self.outfile, 'w', encoding='utf-8')
+            self._flush()
+
+    def write(self, report: FileReport) -> None:
+        self.parts.append(render_html_row(report.file, report.avg_word_len, report.avg_sent_len, report.top_ent,
+                                          report.top_verb, report.vso_triples))
+        if self.stream:
+            self._flush()
+
+    def close(self) -> None:
+        self.parts.append(HTML_END)
+        if self.stream:
+            self._flush()
+            self.otf.close()
+            self.otf = None
+        else:
+            with open(self.outfile, 'w', encoding='utf-8') as otf:
+                otf.write(''.join(self.parts))
+        self.parts = []
+
+    def _flush(self) -> None:
+        """write the rendered parts to the open file in one piece."""
+        self.otf.write(''.join(self.parts))
+        self.otf.flush()
+        self.parts = []
+
+
+class JsonSink(OutputSink):
+    """
+    Write the results (see FileReport.to_dict) into 'outfile' as json lines, one object per file, or with
+    'lines=False' as one json list. Every file is written as soon as it comes, so the memory does not grow with the
+    number of files.
+    """
+
+    def __init__(self, outfile: str, lines=True):
+        self.outfile = outfile
+        self.lines = lines
+        self.otf = None
+        self.first = True
+
+    def start(self, files: List[str]) -> None:
+        self.otf = open(self.outfile, 'w', encoding='utf-8')
+        self.first = True
+        if not self.lines:
+            self.otf.write('[')
+
+    def write(self, report: FileReport) -> None:
+        line = json.dumps(report.to_dict(), ensure_ascii=False)
+        if self.lines:
+            self.otf.write(line + '\n')
+        else:
+            self.otf.write(('\n' if self.first else ',\n') + line)
+        self.first = False
+        self.otf.flush()
+
+    def close(self) -> None:
+        if not self.lines:
+            self.otf.write('\n]\n')
+        self.otf.close()
+
+
+def table_row(report: FileReport) -> Dict:
+    """The results of a file as a row of the table formats (see TABLE_COLUMNS)."""
+    return {
+        'file': report.file,
+        'corpus': corpus_name(report.file),
+        'avg_word_len': report.avg_word_len,
+        'avg_sent_len': report.avg_sent_len,
+        'entities': [text for (text, _), _ in report.top_ent],
+        'entity_labels': [label for (_, label), _ in report.top_ent],
+        'entity_counts': [number for _, number in report.top_ent],
+        'verbs': [verb for verb, _ in report.top_verb],
+        'verb_counts': [number for _, number in report.top_verb],
+        'vso_verbs': [verb for (verb, _, _), _ in report.vso_triples],
+        'vso_subjects': [subject for (_, subject, _), _ in report.vso_triples],
+        'vso_objects': [obj for (_, _, obj), _ in report.vso_triples],
+        'vso_counts': [number for _, number in report.vso_triples],
+    }
+
+
+def import_pyarrow():
+    """pyarrow (with parquet and ipc) if it is installed, else None."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+class TableSink(OutputSink):
+    """
+    Write the results into 'outfile' as a table, one row per file (see TABLE_COLUMNS), in the format of its extension:
+    parquet (.parquet) or arrow ipc (.arrow, .feather), which need pyarrow, or csv, where the lists are json strings.
+    Without pyarrow a parquet or arrow file is written as csv instead, with the extension .csv.
+    The rows are written every 'row_group_size' files (csv: every file), so the memory does not grow with the number
+    of files.
+    """
+
+    def __init__(self, outfile: str, row_group_size=ROW_GROUP_SIZE):
+        root, extension = os.path.splitext(outfile)
+        self.format = extension.lower().lstrip('.')
+        self.pa = import_pyarrow() if self.format != 'csv' else None
+        if self.format != 'csv' and self.pa is None:
+            print(f"pyarrow is not installed, {outfile} is written as {root}.csv", file=sys.stderr)
+            self.format, outfile = 'csv', root + '.csv'
+        self.outfile = outfile
+        self.row_group_size = row_group_size
+        self.rows = []
+        self.otf = None
+        self.writer = None
+
+    def schema(self):
+        """the arrow schema of the table."""
+        pa = self.pa
+        types = {'file': pa.string(), 'corpus': pa.string(), 'avg_word_len': pa.float64(),
+                 'avg_sent_len': pa.float64()}
+        for column in LIST_COLUMNS:
+            types[column] = pa.list_(pa.int64() if column.endswith('_counts') else pa.string())
+        return pa.schema([(column, types[column]) for column in TABLE_COLUMNS])
+
+    def start(self, files: List[str]) -> None:
+        self.rows = []
+        if self.format == 'csv':
+            self.otf = open(self.outfile, 'w', encoding='utf-8', newline='')
+            self.writer = csv.DictWriter(self.otf, TABLE_COLUMNS)
+            self.writer.writeheader()
+        elif self.format == 'parquet':
+            self.writer = self.pa.parquet.ParquetWriter(self.outfile, self.schema())
+        else:
+            self.writer = self.pa.ipc.new_file(self.outfile, self.schema())
+
+    def write(self, report: FileReport) -> None:
+        row = table_row(report)
+        if self.format == 'csv':
+            row.update((column, json.dumps(row[column], ensure_ascii=False)) for column in LIST_COLUMNS)
+            self.writer.writerow(row)
+            self.otf.flush()
+            return
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self._write_rows()
+
+    def _write_rows(self) -> None:
+        """write the rows collected so far as one row group (record batch)."""
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema()))
+            self.rows = []
+
+    def close(self) -> None:
+        if self.format == 'csv':
+            self.otf.close()
+            return
+        self._write_rows()
+        self.writer.close()
+
+
+def export_sink(outfile: str) -> OutputSink:
+    """The machine readable output format of 'outfile', by its extension (see JSON_EXTENSIONS and TABLE_EXTENSIONS)."""
+    extension = os.path.splitext(outfile)[1].lower()
+    if extension in JSON_EXTENSIONS:
+        return JsonSink(outfile, lines=extension != '.json')
+    if extension in TABLE_EXTENSIONS:
+        return TableSink(outfile)
+    raise ValueError(f"unknown output format {extension or outfile!r}, use one of "
+                     f"{', '.join(JSON_EXTENSIONS + TABLE_EXTENSIONS)}")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> parse a paragraph which is repeated (licenses, mastheads, captions, ...) only once
+# 1. a memo of the statistics of single paragraphs, keyed on a hash of their text, the least recently used go first
+# 2. optionally backed by a directory of the parse cache, so other processes and later runs reuse the repeats too
+# 3. only the paragraphs seen before are kept, so the paragraphs seen once are still counted in batches
+
+
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from corpus_stats import CorpusStats
+from models import DEFAULT_MODEL
+from parse_cache import ParseCache, settings, CACHE_SIZE_MB
+
+# the number of paragraphs whose statistics are kept in memory
+MEMO_SIZE = 10000
+# the subdirectory of the parse cache with the repeated paragraphs
+MEMO_DIRECTORY = 'paragraphs'
+
+# the memos of this process (see get_memo), the lock makes one memo per key also when several threads ask for it
+_memos = {}
+_memos_lock = threading.Lock()
+
+
+class ParagraphMemo:
+    """
+    The statistics of the last 'size' distinct repeated paragraphs parsed in this process, pickled (see
+    corpus_stats.InternedCounter), so they take little memory. The keys of the last 'size' paragraphs seen are kept
+    as well, a paragraph is only kept when it comes again (see seen_before).
+    With a ParseCache 'cache', the repeated paragraphs are also written to the cache, and a paragraph which is not in
+    memory is looked for there.
+    :param config: everything else the statistics of a paragraph depend on: the model and the pipeline configuration
+        (see parse_cache.settings), it is part of the keys.
+    """
+
+    def __init__(self, size=MEMO_SIZE, cache: Optional[ParseCache] = None, config=''):
+        self.size = size
+        self.cache = cache
+        self.config = config
+        self._entries = OrderedDict()
+        self._seen = OrderedDict()
+        self.hits = 0
+
+    def key(self, paragraph: str) -> str:
+        """the key of a paragraph: a hash of its text (as split and joined by the paragraph generator) and config."""
+        return hashlib.sha256('\n'.join([self.config, paragraph]).encode('utf-8')).hexdigest()
+
+    def seen_before(self, key) -> bool:
+        """whether the paragraph with 'key' was seen before, it counts as seen from now on."""
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.size:
+            self._seen.popitem(last=False)
+        return False
+
+    def get(self, key) -> Optional[CorpusStats]:
+        """the statistics of the paragraph with 'key', or None if they are not kept."""
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pickle.loads(data)
+        if self.cache is not None:
+            data = self.cache.get(key)
+            if data is not None:
+                stats = CorpusStats.from_dict(data)
+                self._add(key, stats)
+                self.hits += 1
+                return stats
+        return None
+
+    def put(self, key, stats: CorpusStats) -> None:
+        """keep the statistics of a repeated paragraph just parsed, also in the cache if there is one."""
+        self._add(key, stats)
+        if self.cache is not None:
+            self.cache.put(key, stats.to_dict())
+
+    def _add(self, key, stats: CorpusStats) -> None:
+        self._entries[key] = pickle.dumps(stats, pickle.HIGHEST_PROTOCOL)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_memo(size=MEMO_SIZE, cache_dir=None, model=DEFAULT_MODEL, lexical=None,
+             cache_size=CACHE_SIZE_MB) -> ParagraphMemo:
+    """
+    the memo of this process for the model 'model' (and the lexical metrics, see parsing_file.preprocess_paragraphs),
+    backed by the subdirectory 'paragraphs' of the parse cache 'cache_dir' if given, which counts towards the size
+    limit 'cache_size' of the cache. it is made on first use and kept for the rest of the process like the models,
+    so a paragraph repeated in several files (e.g. the license of Project Gutenberg) is also parsed only once.
+    getting the memo is thread-safe, but a memo itself is not: it is meant for the tasks of a process, which run one
+    after the other.
+    """
+    metrics = None if lexical is None else tuple(sorted(lexical))
+    key = (size, cache_dir, cache_size, model, metrics)
+    with _memos_lock:
+        if key not in _memos:
+            cache = ParseCache(cache_dir, cache_size).subcache(MEMO_DIRECTORY) if cache_dir else None
+            config = settings(model, {} if metrics is None else {'lexical': list(metrics)})
+            _memos[key] = ParagraphMemo(size, cache, config)
+        return _memos[key]
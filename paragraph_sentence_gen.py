@@ -19,27 +19,330 @@
 # Task --> Generate paragraph and sentence out of a hard wrapped text file.
 # 1. generate paragraph
 # 2. generate sentence
+# 3. generate shards (lists of paragraphs) for parsing one file with several processes
+# 4. read the file in large blocks, also gzip or bz2 compressed, and give the byte offsets of every paragraph
+# 5. different ways of splitting a text into paragraphs (hard wrapped or soft wrapped text)
+# 6. split paragraphs which are too long for one Doc, preferably at the end of a sentence
+# 7. drop the header and the footer of Project Gutenberg (the license) before parsing
+# 8. go on reading the pieces of a file where a checkpoint stopped, also in the middle of a paragraph
 
-import spacy
+import bz2
+import codecs
+import gzip
+import io
+import re
+from itertools import chain
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from models import get_nlp, DEFAULT_MODEL, SENT_DISABLE
 
-nlp = spacy.load("en_core_web_sm")
 
+BLOCK_SIZE = 1 << 20
 
-def generate_para(file):
-    """paragraph generator"""
-    with open(file, "r", encoding='utf-8') as infile:
-        paragraph = ''
-        for line in infile:
-            if not line.isspace():
-                paragraph += line.strip()
-            else:
-                if paragraph:
-                    yield paragraph
-                    paragraph = ''
+# what separates two paragraphs
+SEGMENTATION = {
+    # hard wrapped text (e.g. Gutenberg): paragraphs are separated by blank lines, their lines are joined
+    'blank-line': re.compile(rb'\n[ \t\r\f\v]*\n\s*'),
+    # soft wrapped text: every line is a paragraph
+    'line': re.compile(rb'\n\s*'),
+}
+DEFAULT_SEGMENTATION = 'blank-line'
+WHITESPACE = b' \t\n\r\f\v'
 
+# the longest paragraph (in characters) given to spaCy in one piece, far above the paragraphs of normal text
+MAX_PARA_CHARS = 10000
+# the end of a sentence, with closing quotes or brackets and the white space after it
+SENTENCE_END = re.compile(r'[.!?]["\'\u2019\u201d)\]]*\s+')
+# the white space left out at the start of a piece
+SPACE = re.compile(r'\s*')
 
-def generate_sent(para):
+# the lines which start and end the text of a Project Gutenberg ebook, e.g. "*** START OF THE PROJECT GUTENBERG
+# EBOOK PRIDE AND PREJUDICE ***" and "End of the Project Gutenberg EBook of ..." or "*** END OF THIS PROJECT ..."
+GUTENBERG_START = re.compile(r'\*+\s*START OF (THE |THIS )?PROJECT GUTENBERG', re.IGNORECASE)
+GUTENBERG_END = re.compile(r'(\*+\s*)?END OF (THE |THIS )?PROJECT GUTENBERG', re.IGNORECASE)
+# the start line is looked for in this many paragraphs at the start of a file
+GUTENBERG_HEADER = 200
+
+
+def open_corpus(file) -> BinaryIO:
+    """
+    open a text file for reading bytes, a gzip or bz2 compressed file (recognised by its content) is decompressed
+    while it is read, without writing it to disk.
+    """
+    with open(file, 'rb') as infile:
+        magic = infile.read(3)
+    if magic[:2] == b'\x1f\x8b':
+        return gzip.open(file, 'rb')
+    if magic == b'BZh':
+        return bz2.open(file, 'rb')
+    return open(file, 'rb')
+
+
+def generate_para_offsets(file, segmentation=DEFAULT_SEGMENTATION, block_size=BLOCK_SIZE,
+                          start=0) -> Iterator[Tuple[str, int, int]]:
+    """
+    paragraph generator with provenance: yield every paragraph with the byte offsets of its start and end in the
+    (decompressed) file. the file is read 'block_size' bytes at a time and split with the regular expression of
+    'segmentation' (see SEGMENTATION), the lines of a paragraph are joined with a space.
+    the last paragraph is yielded also if the file does not end with a blank line.
+    reading starts at the byte offset 'start', which should be the start of a paragraph.
+    """
+    with open_corpus(file) as infile:
+        infile.seek(start)
+        yield from read_para_offsets(infile, segmentation, block_size, start)
+
+
+def read_para_offsets(infile: BinaryIO, segmentation=DEFAULT_SEGMENTATION, block_size=BLOCK_SIZE,
+                      start=0) -> Iterator[Tuple[str, int, int]]:
+    """the same as generate_para_offsets for a binary file object, which is at the byte offset 'start'."""
+    parts = []
+    for part, offset, last in _read_parts(infile, segmentation, block_size, start):
+        if not parts:
+            begin = offset
+        parts.append(part)
+        if last:
+            text = b''.join(parts)
+            parts = []
+            paragraph = _paragraph(text, 0, len(text), begin)
+            if paragraph:
+                yield paragraph
+
+
+def read_paragraphs(infile: BinaryIO, segmentation=DEFAULT_SEGMENTATION, block_size=BLOCK_SIZE,
+                    max_chars=MAX_PARA_CHARS) -> Iterator[str]:
+    """
+    the paragraphs of a binary file object (see read_para_offsets) without their offsets. a paragraph longer than
+    'max_chars' characters is split into the same pieces as by split_long_paragraph, but while it is read: only the
+    part which is not split yet is kept, so a huge paragraph (e.g. a text without blank lines) is never in memory.
+    """
+    if not max_chars:
+        for paragraph, _, _ in read_para_offsets(infile, segmentation, block_size):
+            yield paragraph
+        return
+    for pieces, _ in read_pieces(infile, segmentation, block_size, max_chars):
+        yield from pieces
+
+
+class ReadState(NamedTuple):
+    """
+    where reading a file can go on (see read_pieces): the byte offset, the start of the current paragraph which is
+    not split yet, whether the next part goes on that paragraph and whether the white space at its start is left out.
+    """
+    offset: int
+    text: str = ''
+    continued: bool = False
+    strip: bool = False
+
+
+def read_pieces(infile: BinaryIO, segmentation=DEFAULT_SEGMENTATION, block_size=BLOCK_SIZE,
+                max_chars=MAX_PARA_CHARS, state=ReadState(0)) -> Iterator[Tuple[List[str], ReadState]]:
+    """
+    the pieces of the paragraphs (see read_paragraphs), for every part read (see _read_parts) the pieces split off
+    while it is read and the state after them: reading the file object from that state (at its offset) gives the
+    same pieces as going on. the file object is at the offset of 'state'. without 'max_chars' the paragraphs are not
+    split, so the state goes back to the start of the current paragraph.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    text, continued, strip = state.text, state.continued, state.strip
+    begin = state.offset  # where the current paragraph starts
+    for part, offset, last in _read_parts(infile, segmentation, block_size, state.offset):
+        if not continued:
+            begin = offset
+        new = decoder.decode(_join_lines(part, continued, last), final=last)
+        continued = not last
+        if strip:
+            new = new.lstrip()
+            strip = not new
+        text += new
+        pieces, pos = cut_pieces(text, max_chars) if max_chars else ([], 0)
+        # the text was cut, but the white space after the cut may go on in the next part
+        strip = strip or 0 < pos == len(text)
+        text = text[pos:]
+        if last:
+            if text:
+                pieces.append(text)
+            text = ''
+            strip = False
+        end = offset + len(part) - len(decoder.getstate()[0])
+        if max_chars or not continued:
+            yield pieces, ReadState(end, text, continued, strip)
+        else:
+            yield pieces, ReadState(begin)
+
+
+def _read_parts(infile: BinaryIO, segmentation, block_size, start=0) -> Iterator[Tuple[bytes, int, bool]]:
+    """
+    the bytes of the paragraphs in the order of the file, a paragraph in one or several parts: every part with its
+    byte offset and whether it is the last one of its paragraph. the file is read 'block_size' bytes at a time and
+    split with the regular expression of 'segmentation' (see SEGMENTATION). only the white space at the end of the
+    text read so far is kept until the next block is read, a separator may start there.
+    """
+    separator = SEGMENTATION[segmentation]
+    buffer = b''
+    offset = start  # where the buffer starts in the file
+    for block in iter(lambda: infile.read(block_size), b''):
+        # the buffer is only white space, a separator may go on in the block
+        buffer += block
+        start = 0
+        for match in separator.finditer(buffer):
+            # a separator at the end of the buffer may go on in the next block
+            if match.end() == len(buffer):
+                break
+            yield buffer[start:match.start()], offset + start, True
+            start = match.end()
+        end = len(buffer)
+        while end > start and buffer[end - 1] in WHITESPACE:
+            end -= 1
+        if end > start:
+            yield buffer[start:end], offset + start, False
+            start = end
+        buffer = buffer[start:]
+        offset += start
+    yield buffer, offset, True
+
+
+def _paragraph(buffer: bytes, start, end, offset) -> Optional[Tuple[str, int, int]]:
+    """the paragraph in buffer[start:end] without the white space around it, None if it is empty."""
+    text = buffer[start:end]
+    # the separators take the white space at the start of a paragraph, except at the start of the file
+    if text[:1].isspace():
+        stripped = text.lstrip()
+        start += len(text) - len(stripped)
+        text = stripped
+    text = text.rstrip()
+    if not text:
+        return None
+    end = offset + start + len(text)
+    if b'\n' in text:
+        text = b' '.join([line.strip() for line in text.split(b'\n')])
+    return text.decode('utf-8'), offset + start, end
+
+
+def _join_lines(part: bytes, continued, last) -> bytes:
+    """
+    the text of a part of a paragraph (see _read_parts) with its lines joined as by _paragraph. a part which goes on
+    a paragraph keeps the white space at its start, or a space for a line break in it.
+    """
+    if last:
+        part = part.rstrip()
+    text = part.lstrip()
+    space = part[:len(part) - len(text)] if continued else b''
+    if b'\n' in space:
+        space = b' '
+    if b'\n' in text:
+        text = b' '.join([line.strip() for line in text.split(b'\n')])
+    return space + text
+
+
+def drop_boilerplate(paragraphs: Iterable, header=GUTENBERG_HEADER, footer: Optional[List] = None) -> Iterator:
+    """
+    the paragraphs (or the paragraphs with their offsets, see generate_para_offsets) of the text of a Project
+    Gutenberg ebook, without the header up to the start line and the footer from the end line on. a file without a
+    start line in its first 'header' paragraphs keeps its start (e.g. a Gutenberg text stripped before, or reading
+    from a checkpoint). the end line is appended to the list 'footer', if given, when it is reached.
+    """
+    paragraphs = iter(paragraphs)
+    start = []
+    for item in paragraphs:
+        if GUTENBERG_START.match(_text(item)):
+            start = []
+            break
+        start.append(item)
+        if len(start) >= header:
+            break
+    for item in chain(start, paragraphs):
+        if GUTENBERG_END.match(_text(item)):
+            if footer is not None:
+                footer.append(item)
+            return
+        yield item
+
+
+def _text(item) -> str:
+    return item if isinstance(item, str) else item[0]
+
+
+def split_long_paragraph(paragraph: str, max_chars=MAX_PARA_CHARS) -> Iterator[str]:
+    """
+    split a paragraph into pieces of at most 'max_chars' characters: after the last end of a sentence which fits into
+    the piece, otherwise at the last space, otherwise after 'max_chars' characters.
+    """
+    pieces, pos = cut_pieces(paragraph, max_chars)
+    yield from pieces
+    if pos < len(paragraph):
+        yield paragraph[pos:]
+
+
+def cut_pieces(text: str, max_chars=MAX_PARA_CHARS) -> Tuple[List[str], int]:
+    """
+    the pieces split off the start of a text (see split_long_paragraph) while more than 'max_chars' characters are
+    left, and where the rest starts. the pieces are the same if the text goes on (e.g. it is read in blocks).
+    """
+    pieces = []
+    pos = 0
+    while len(text) - pos > max_chars:
+        # one character more, a sentence may end just before the white space after it
+        end = pos + max_chars + 1
+        cut = pos
+        for match in SENTENCE_END.finditer(text, pos, end):
+            cut = match.end()
+        if cut == pos:
+            cut = text.rfind(' ', pos, end)
+        if cut <= pos:
+            cut = pos + max_chars
+        piece = text[pos:cut].rstrip()
+        if piece:
+            pieces.append(piece)
+        pos = SPACE.match(text, cut).end()
+    return pieces, pos
+
+
+def generate_para(file, segmentation=DEFAULT_SEGMENTATION, max_chars=MAX_PARA_CHARS, boilerplate=False):
+    """
+    paragraph generator
+    paragraphs longer than 'max_chars' characters (e.g. a text without blank lines) are split into pieces while they
+    are read (see read_paragraphs), so no Doc gets too large and shards of paragraphs take about the same time. 0 or
+    None does not split them.
+    with 'boilerplate' the header and the footer of Project Gutenberg are left out (see drop_boilerplate).
+    """
+    with open_corpus(file) as infile:
+        paragraphs = read_paragraphs(infile, segmentation, max_chars=max_chars)
+        if boilerplate:
+            paragraphs = drop_boilerplate(paragraphs)
+        yield from paragraphs
+
+
+def limit_length(paragraph: str, max_chars=MAX_PARA_CHARS) -> Iterator[str]:
+    """the paragraph, or its pieces if it is longer than 'max_chars' characters."""
+    if max_chars and len(paragraph) > max_chars:
+        yield from split_long_paragraph(paragraph, max_chars)
+    else:
+        yield paragraph
+
+
+def generate_shards(file, shard_size, segmentation=DEFAULT_SEGMENTATION, max_chars=MAX_PARA_CHARS, boilerplate=False):
+    """shard generator, every shard is a list of (at most) 'shard_size' consecutive paragraphs"""
+    return shard_paragraphs(generate_para(file, segmentation, max_chars, boilerplate), shard_size)
+
+
+def shard_paragraphs(paragraphs: Iterable[str], shard_size) -> Iterator[List[str]]:
+    """cut a stream of paragraphs into lists of (at most) 'shard_size' consecutive paragraphs"""
+    shard = []
+    for paragraph in paragraphs:
+        shard.append(paragraph)
+        if len(shard) == shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+def text_paragraphs(text: str, segmentation=DEFAULT_SEGMENTATION, max_chars=MAX_PARA_CHARS) -> Iterator[str]:
+    """the paragraphs of a text given as a string (e.g. sent to the service), split like the ones of a file."""
+    return read_paragraphs(io.BytesIO(text.encode('utf-8')), segmentation, max_chars=max_chars)
+
+
+def generate_sent(para, model=DEFAULT_MODEL):
     """sentence generator"""
-    doc = nlp(para)
+    doc = get_nlp(model)(para, disable=SENT_DISABLE)
     for sent in doc.sents:
         yield sent.text.strip()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> keep the parse results of a file on disk, so the same corpus is not parsed again in the next run
+# 1. a key made of the file content, the spaCy model and version, and the pipeline configuration
+# 2. store and load the results (as json) under that key
+# 3. keep the cache under a size limit, removing the least recently used entries first
+# 4. subdirectories of entries (e.g. the repeated paragraphs) which share the size limit of the cache
+
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from importlib import metadata
+from typing import Dict, Optional
+
+CACHE_SIZE_MB = 512
+# the directory is listed again after this many entries written, for the ones written by other processes
+EVICT_EVERY = 1000
+# the share of the size limit the cache is brought down to when it is too large, so it is not listed every time
+EVICT_TO = 0.9
+# the names of the entries (the keys are sha256 hex digests, see cache_key), nothing else in the directory is touched
+ENTRY_NAME = re.compile(r'[0-9a-f]{64}\.json')
+# the file which marks a subdirectory as a part of the cache (see subcache)
+SUBCACHE_MARKER = '.parse_cache'
+
+
+def file_hash(file, block_size=1 << 20) -> str:
+    """the sha256 of the content of a file, read block by block."""
+    sha = hashlib.sha256()
+    with open(file, 'rb') as infile:
+        for block in iter(lambda: infile.read(block_size), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def model_version(model) -> str:
+    """the version of a spaCy model (installed package or directory) without loading it."""
+    meta_file = os.path.join(model, 'meta.json')
+    if os.path.isfile(meta_file):
+        with open(meta_file, encoding='utf-8') as infile:
+            return json.load(infile).get('version', 'unknown')
+    try:
+        return metadata.version(model)
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def cache_key(file, model, config: Dict) -> str:
+    """
+    the key of the parse results of 'file': its content, the spaCy and model versions and the pipeline configuration
+    'config' (everything else which changes the results), so a changed file or setting never gets old results.
+    """
+    parts = [file_hash(file), settings(model, config)]
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def settings(model, config: Dict) -> str:
+    """the model name and version, the spaCy version and the pipeline configuration as one string."""
+    try:
+        spacy_version = metadata.version('spacy')
+    except metadata.PackageNotFoundError:
+        spacy_version = 'unknown'
+    return '\n'.join([model, model_version(model), spacy_version, json.dumps(config, sort_keys=True)])
+
+
+class ParseCache:
+    """
+    A directory of parse results, one json file per key. Reading an entry marks it as recently used (its
+    modification time), and when the entries get larger than 'max_size_mb' the least recently used ones are removed
+    (see evict). The cache 'root' (by default the directory itself) is the one the size limit is for: the entries in
+    it and in the subdirectories made by subcache are counted together. The keys are sha256 hex digests, so other
+    files in these directories are never counted or removed.
+    The numbers of hits and misses of this object are counted for the output.
+    """
+
+    def __init__(self, directory, max_size_mb=CACHE_SIZE_MB, root=None):
+        self.directory = directory
+        self.max_size_mb = max_size_mb
+        self.max_size = max_size_mb * 1024 * 1024
+        self.root = root or directory
+        self.hits = 0
+        self.misses = 0
+        # the size of the entries when the directory was last listed, plus the ones written since, and their number
+        self._size = None
+        self._puts = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def subcache(self, name) -> 'ParseCache':
+        """
+        the cache in the subdirectory 'name', with the same size limit for both of them together. the subdirectory
+        is marked (SUBCACHE_MARKER), so the caches of other processes count it as well.
+        """
+        cache = ParseCache(os.path.join(self.directory, name), self.max_size_mb, self.root)
+        open(os.path.join(cache.directory, SUBCACHE_MARKER), 'a').close()
+        return cache
+
+    def _path(self, key) -> str:
+        name = key + '.json'
+        if not ENTRY_NAME.fullmatch(name):
+            raise ValueError(f"not a cache key: {key!r}")
+        return os.path.join(self.directory, name)
+
+    def get(self, key) -> Optional[Dict]:
+        """the results stored under 'key', or None."""
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as infile:
+                data = json.load(infile)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key, data: Dict) -> None:
+        """
+        store 'data' under 'key'. the file is written next to its place and then renamed, so readers (e.g. other
+        processes) never see half of it.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as otf:
+            json.dump(data, otf)
+        path = self._path(key)
+        os.replace(tmp_path, path)
+        self._puts += 1
+        if self._size is None or self._puts >= EVICT_EVERY:
+            self.evict()
+            return
+        self._size += os.path.getsize(path)
+        if self._size > self.max_size:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        list the entries of the cache, and if they are larger than the size limit remove the least recently used
+        ones until they take EVICT_TO of it. between two calls the size is kept up to date by put, so the directory
+        is only listed when the cache gets full or after EVICT_EVERY entries written.
+        """
+        entries = []
+        subcaches = [entry.path for entry in os.scandir(self.root)
+                     if entry.is_dir() and os.path.isfile(os.path.join(entry.path, SUBCACHE_MARKER))]
+        for directory in [self.root] + subcaches:
+            for name in os.listdir(directory):
+                if ENTRY_NAME.fullmatch(name):
+                    path = os.path.join(directory, name)
+                    try:
+                        info = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((info.st_mtime, info.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_size:
+            for _, size, path in sorted(entries):
+                if total <= self.max_size * EVICT_TO:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+        self._size = total
+        self._puts = 0
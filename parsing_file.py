@@ -19,49 +19,449 @@
 # Task --> combine various modules to preprocess a single file, and get the vso-triples
 # 1. preprocess a single file
 # 2. get the target vso chunks for a single file
-# 3. reset the class variables to save memory
+# 3. collect the statistics of a run in a CorpusStats object
+# 4. feed the paragraphs to spaCy in batches (nlp.pipe), optionally with several processes
+# 5. split a single file into shards for a process pool and merge the partial results again
+# 6. analyse a file completely in one worker, so only the compact results go back to the main process
+# 7. keep the statistics of a file in an on-disk cache, so the same file is not parsed again
+# 8. the results of analysing a file, as they are written out
+# 9. time the stages and count the documents of every task (see instrumentation.py)
+# 10. split the files into paragraphs in the way asked for (hard or soft wrapped text)
+# 11. with a checkpoint, parse only the paragraphs appended to a file since the last run
+# 12. parse a repeated paragraph only once (see paragraph_memo.py), and optionally drop the Gutenberg boilerplate
 
-from preprocessing import computer_average, Preprocessor
-from paragraph_sentence_gen import generate_para
-from VSO_chunks import VsoGenerator
-from typing import List, Tuple
+from preprocessing import computer_average, count_verbs, count_vso, Preprocessor
+from models import get_nlp, get_lexical_nlp, DEFAULT_MODEL
+from paragraph_sentence_gen import generate_para, shard_paragraphs, DEFAULT_SEGMENTATION, MAX_PARA_CHARS
+from checkpoint import checkpoint_file, preprocess_incremental
+from corpus_stats import CorpusStats
+from paragraph_memo import get_memo, ParagraphMemo
+from parse_cache import ParseCache, cache_key, CACHE_SIZE_MB
+from instrumentation import Instruments, get_instruments, profiled, recording
+from collections import deque
+import resource
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 
-def preprocess_one_file(args_prep) -> Tuple[float, float, Tuple, Tuple, List]:
+BATCH_SIZE = 64
+
+
+class FileReport:
+    """
+    The results of analysing one file, the same object is handed to every output format.
+    :param peak_rss: the peak memory (MB) of the process which analysed the file.
+    :param cache_status: 'hit' or 'miss' of the parse cache, None without a cache.
+    :param instruments: the timers and counters of analysing the file (Instruments.to_dict).
+    :param sample: for a file analysed from a sample of its paragraphs, the sample, the confidence intervals and the
+        stability of the top lists (see sampling.sample_summary), None if the whole file was analysed.
+    """
+
+    def __init__(self, file, avg_word_len, avg_sent_len, top_ent, top_verb, vso_triples, peak_rss=None,
+                 cache_status=None, instruments=None, sample=None):
+        self.file = file
+        self.avg_word_len = avg_word_len
+        self.avg_sent_len = avg_sent_len
+        self.top_ent = top_ent
+        self.top_verb = top_verb
+        self.vso_triples = vso_triples
+        self.peak_rss = peak_rss
+        self.cache_status = cache_status
+        self.instruments = instruments
+        self.sample = sample
+
+    def to_dict(self) -> Dict:
+        """the results as plain lists and numbers, e.g. to send them as json."""
+        return {
+            'file': self.file,
+            'avg_word_len': self.avg_word_len,
+            'avg_sent_len': self.avg_sent_len,
+            'top_ent': [[list(key), number] for key, number in self.top_ent],
+            'top_verb': [list(pair) for pair in self.top_verb],
+            'vso_triples': [[list(key), number] for key, number in self.vso_triples],
+            'peak_rss': self.peak_rss,
+            'cache_status': self.cache_status,
+            'sample': self.sample,
+        }
+
+
+def preprocess_paragraphs(paragraphs: Iterable[str], batch_size=BATCH_SIZE, n_process=1, vso_capacity=None,
+                          model=DEFAULT_MODEL, lexical=None, memo: Optional[ParagraphMemo] = None,
+                          instruments: Optional[Instruments] = None) -> CorpusStats:
+    """
+    preprocess a stream of paragraphs (a whole file or one shard of it), the paragraphs are fed into nlp.pipe of the
+    spaCy model 'model', 'batch_size' paragraphs at a time and over 'n_process' processes.
+    return the statistics of the paragraphs: the counts of named entities and verbs, the sums of sentences, tokens
+    and characters, and the counts of the candidate vso triples of all the verbs (at most 'vso_capacity' of them,
+    approximately, if given).
+    with 'lexical' (a list of metrics, see models.LEXICAL_COMPONENTS) the paragraphs are only split into tokens and
+    sentences, and the named entities or verbs are only counted if asked for, without the dependency parse and
+    the vso triples.
+    with a ParagraphMemo 'memo' a paragraph parsed before is not parsed again (see paragraph_memo.py).
+    the timers and counters go to 'instruments', by default the ones of the running task (see get_instruments).
+    """
+    instruments = instruments or get_instruments()
+    nlp = get_nlp(model) if lexical is None else get_lexical_nlp(model, lexical)
+    if memo is not None:
+        return preprocess_memoised(paragraphs, nlp, memo, batch_size, n_process, vso_capacity, lexical, instruments)
+    docs = instruments.timed_iter('spacy', nlp.pipe(paragraphs, batch_size=batch_size, n_process=n_process))
+    return preprocess_docs(docs, nlp.vocab.strings, batch_size, vso_capacity, lexical, instruments)
+
+
+def preprocess_docs(docs: Iterable, strings, batch_size=BATCH_SIZE, vso_capacity=None, lexical=None,
+                    instruments: Optional[Instruments] = None) -> CorpusStats:
+    """
+    the statistics of paragraphs already parsed by spaCy (see preprocess_paragraphs), 'strings' is the StringStore
+    of the model. the verbs and the candidate vso triples of 'batch_size' paragraphs are counted together, from their
+    token arrays. with 'lexical' only the metrics in it are counted besides the sums (see preprocess_paragraphs).
+    """
+    stats = CorpusStats(vso_capacity)
+    instruments = instruments or get_instruments()
+    verbs = lexical is None or 'verbs' in lexical
+    ents = lexical is None or 'ents' in lexical
+    vso = lexical is None
+    token_arrays, texts = [], []
+
+    def count_batch():
+        if verbs:
+            count_verbs(token_arrays, strings, stats.verb_counts)
+        if vso:
+            count_vso(token_arrays, texts, strings, stats.vso_candidates)
+    for doc in docs:
+        with instruments.timer('Preprocessor'):
+            para_obj = Preprocessor(doc.text, doc)
+        para_obj.update_stats(stats, verbs=False, ents=ents, vso=False)
+        if verbs or vso:
+            token_arrays.append(para_obj.token_array)
+            texts.append(doc.text)
+        if len(token_arrays) >= batch_size:
+            count_batch()
+            token_arrays, texts = [], []
+        instruments.count('docs')
+    count_batch()
+    instruments.count('sentences', stats.sent_sum)
+    instruments.count('tokens', stats.token_sum)
+    return stats
+
+
+def preprocess_memoised(paragraphs: Iterable[str], nlp, memo: ParagraphMemo, batch_size=BATCH_SIZE, n_process=1,
+                        vso_capacity=None, lexical=None, instruments: Optional[Instruments] = None) -> CorpusStats:
+    """
+    the same statistics as preprocess_paragraphs, but a paragraph whose statistics are in 'memo' is not parsed
+    (by 'nlp') again. a paragraph seen before (see ParagraphMemo.seen_before) is counted on its own and kept in the
+    memo, the runs of other paragraphs in between are counted in batches by preprocess_docs. everything is merged
+    in the order of the text, so the counts and the order of ties are the same as without the memo.
+    nlp.pipe takes the paragraphs before they are parsed (a batch, or more with several processes), so a repeat of
+    a paragraph which is kept but not parsed yet waits for its statistics instead of being parsed as well.
+    """
+    instruments = instruments or get_instruments()
+    stats = CorpusStats(vso_capacity)
+    hits = memo.hits
+    tail = []
+    event = []
+    # the paragraphs to keep which are not counted yet, with the number of repeats waiting for them, and the
+    # statistics of the ones counted since for the repeats still waiting
+    waiting = {}
+    kept = {}
+    waited = 0
+
+    def new_paragraphs():
+        # every paragraph to parse takes along the statistics (or the keys, if they are waited for) of the repeated
+        # paragraphs just before it
+        repeats = []
+        for paragraph in paragraphs:
+            key = memo.key(paragraph)
+            if key in waiting:
+                waiting[key] += 1
+                repeats.append(key)
+                continue
+            known = memo.get(key)
+            if known is None:
+                keep = memo.seen_before(key)
+                if keep:
+                    waiting[key] = 0
+                yield paragraph, (key, repeats, keep)
+                repeats = []
+            else:
+                repeats.append(known)
+        tail.extend(repeats)
+    docs = nlp.pipe(new_paragraphs(), batch_size=batch_size, n_process=n_process, as_tuples=True)
+    docs = instruments.timed_iter('spacy', docs)
+
+    def run():
+        # the docs up to the next one which comes after repeats or is to be kept
+        for doc, (key, repeats, keep) in docs:
+            if repeats or keep:
+                event.append((doc, key, repeats, keep))
+                return
+            yield doc
+
+    def merge_repeats(repeats):
+        nonlocal waited
+        for known in repeats:
+            if isinstance(known, str):
+                entry = kept[known]
+                entry[1] -= 1
+                if not entry[1]:
+                    del kept[known]
+                known = entry[0]
+                waited += 1
+            stats.merge(known)
+    while True:
+        stats.merge(preprocess_docs(run(), nlp.vocab.strings, batch_size, vso_capacity, lexical, instruments))
+        if not event:
+            break
+        doc, key, repeats, keep = event.pop()
+        merge_repeats(repeats)
+        own = preprocess_docs([doc], nlp.vocab.strings, batch_size, None, lexical, instruments)
+        if keep:
+            memo.put(key, own)
+            number = waiting.pop(key)
+            if number:
+                kept[key] = [own, number]
+        stats.merge(own)
+    merge_repeats(tail)
+    instruments.count('memo_hits', memo.hits - hits + waited)
+    return stats
+
+
+def preprocess_shard(paragraphs: List[str], batch_size=BATCH_SIZE, vso_capacity=None, model=DEFAULT_MODEL,
+                     profile_dir=None, lexical=None, dedup=0, cache_dir=None,
+                     cache_size=CACHE_SIZE_MB) -> Tuple[CorpusStats, Dict]:
+    """
+    the task of a pool process in preprocess_one_file_sharded: preprocess one shard and return its statistics
+    together with the timers and counters of the task, profiled into 'profile_dir' if given.
+    with 'dedup' the process keeps a memo of that many paragraphs (see paragraph_memo.get_memo), with 'cache_dir' also
+    in the parse cache of the size 'cache_size'.
+    """
+    instruments = Instruments()
+    with recording(instruments), profiled(profile_dir):
+        memo = get_memo(dedup, cache_dir, model, lexical, cache_size) if dedup else None
+        stats = preprocess_paragraphs(paragraphs, batch_size, 1, vso_capacity, model, lexical, memo, instruments)
+    instruments.count('shards')
+    return stats, instruments.to_dict()
+
+
+def summarise_file(stats: CorpusStats, max_ent, max_v) -> Tuple[float, float, Tuple, Tuple, CorpusStats]:
+    """get the statistics for output and the most common entities and verbs out of the statistics of a file."""
+    avg_word_len = computer_average(stats.char_sum, stats.token_sum)
+    avg_sent_len = computer_average(stats.token_sum, stats.sent_sum)
+    top_ent = stats.ner_counts.most_common(max_ent)
+    top_verb = stats.verb_counts.most_common(max_v)
+    return avg_word_len, avg_sent_len, top_ent, top_verb, stats
+
+
+def file_config(vso_capacity, segmentation, max_para_chars, lexical=None, boilerplate=False) -> Dict:
+    """
+    the settings the statistics of a file depend on, for the keys of the parse cache and the checkpoints. the
+    lexical metrics and dropping the boilerplate are only in it when they are used, so the keys of full runs stay
+    the same.
+    """
+    config = {'vso_capacity': vso_capacity, 'segmentation': segmentation, 'max_para_chars': max_para_chars}
+    if lexical is not None:
+        config['lexical'] = sorted(lexical)
+    if boilerplate:
+        config['boilerplate'] = True
+    return config
+
+
+def cached_stats(file, model, config: Dict, cache: Optional[ParseCache], preprocess: Callable[[], CorpusStats],
+                 instruments: Optional[Instruments] = None) -> CorpusStats:
+    """
+    get the statistics of a file from 'cache', or call 'preprocess' and store its statistics in the cache.
+    the key covers everything the statistics depend on ('config': the settings such as vso_capacity and
+    segmentation), but not max_ent, max_v etc. which only pick out of them.
+    """
+    if cache is None:
+        return preprocess()
+    instruments = instruments or get_instruments()
+    key = cache_key(file, model, config)
+    data = cache.get(key)
+    if data is not None:
+        instruments.count('cache_hits')
+        return CorpusStats.from_dict(data)
+    instruments.count('cache_misses')
+    stats = preprocess()
+    cache.put(key, stats.to_dict())
+    return stats
+
+
+def preprocess_file(file, model, config: Dict, checkpoint_dir,
+                    preprocess: Callable[[Iterable[str]], CorpusStats]) -> CorpusStats:
+    """
+    call 'preprocess' on the paragraphs of the file, or, with a 'checkpoint_dir', only on the paragraphs after the
+    checkpoint of the file (see checkpoint.preprocess_incremental) and merge them into the saved statistics.
+    """
+    if checkpoint_dir:
+        path = checkpoint_file(checkpoint_dir, file, model, config)
+        return preprocess_incremental(file, path, config['segmentation'], config['max_para_chars'],
+                                      config['vso_capacity'], preprocess, config.get('boilerplate', False))
+    return preprocess(generate_para(file, config['segmentation'], config['max_para_chars'],
+                                    config.get('boilerplate', False)))
+
+
+def preprocess_one_file(file, max_ent, max_v, batch_size=BATCH_SIZE, n_process=1, vso_capacity=None,
+                        model=DEFAULT_MODEL, cache=None, segmentation=DEFAULT_SEGMENTATION,
+                        max_para_chars=MAX_PARA_CHARS, checkpoint_dir=None, lexical=None, dedup=0,
+                        boilerplate=False, instruments=None) -> Tuple[float, float, Tuple, Tuple, CorpusStats]:
     """
     for a single file, preprocess it, getting the statistics for output
     getting the most common entities and most common verbs for output
-    getting the whole sentences list and the most common verbs also for further generating vso-triples
-    """
-    file, max_ent, max_v = args_prep
-    para = generate_para(file)
-    for p in para:
-        sent_obj = Preprocessor(p)
-        Preprocessor.get_ner(sent_obj)
-        Preprocessor.get_verb(sent_obj)
-        Preprocessor.get_sum_token_sent_char(sent_obj)
-    avg_word_len = computer_average(Preprocessor.char_sum, Preprocessor.token_sum)
-    avg_sent_len = computer_average(Preprocessor.token_sum, Preprocessor.sent_sum)
-    top_ent = Preprocessor.ner_counts.most_common(max_ent)
-    top_verb = Preprocessor.verb_counts.most_common(max_v)
-    assert len(Preprocessor.sentence_list) == Preprocessor.sent_sum
-    return avg_word_len, avg_sent_len, top_ent, top_verb, Preprocessor.sentence_list
-
-
-def get_vso_one_file(args_vso) -> List[Tuple]:
-    """for a single file, get the target vso triples (most common vso triples for target verbs)."""
-    sentences, top_verb, max_tr = args_vso
-    target_verb = []
+    getting the statistics with the candidate vso triples of all the verbs and the most common verbs also for
+    further generating vso-triples, so that the file is read and parsed in a single pass
+    the paragraphs are streamed into nlp.pipe, 'batch_size' paragraphs at a time and over 'n_process' processes.
+    with a ParseCache 'cache', a file parsed before (with the same model and settings) is not parsed again.
+    'segmentation' is the way the file is split into paragraphs (see paragraph_sentence_gen.SEGMENTATION), longer
+    paragraphs than 'max_para_chars' characters are split further.
+    with a 'checkpoint_dir', only the paragraphs appended since the last run are parsed (see preprocess_file).
+    with 'lexical' the faster lexical pipeline is used (see preprocess_paragraphs).
+    with 'dedup' a paragraph is parsed only once, the statistics of the last 'dedup' distinct paragraphs are kept for
+    their repeats (see paragraph_memo.get_memo, also in the parse cache if there is one).
+    with 'boilerplate' the header and the footer of Project Gutenberg are not parsed (see drop_boilerplate).
+    the timers and counters go to 'instruments', by default the ones of the running task (see get_instruments).
+    """
+    def preprocess_stream(paragraphs):
+        memo = None
+        if dedup:
+            memo = get_memo(dedup, cache and cache.directory, model, lexical, cache and cache.max_size_mb)
+        return preprocess_paragraphs(paragraphs, batch_size, n_process, vso_capacity, model, lexical, memo,
+                                     instruments)
+
+    def preprocess():
+        return preprocess_file(file, model, config, checkpoint_dir, preprocess_stream)
+    config = file_config(vso_capacity, segmentation, max_para_chars, lexical, boilerplate)
+    return summarise_file(cached_stats(file, model, config, cache, preprocess, instruments), max_ent, max_v)
+
+
+def ordered_imap(pool, func, iterable: Iterable, window: int, instruments: Optional[Instruments] = None):
+    """
+    like pool.imap, but at most 'window' tasks are submitted at a time, so a large file is not read into the
+    task queue all at once. results are yielded in the order of the iterable.
+    the time spent waiting for the results (the pool and the transfer of the results) is the timer 'pool_wait'.
+    """
+    instruments = instruments or get_instruments()
+    pending = deque()
+    for item in iterable:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= window:
+            with instruments.timer('pool_wait'):
+                result = pending.popleft().get()
+            yield result
+    while pending:
+        with instruments.timer('pool_wait'):
+            result = pending.popleft().get()
+        yield result
+
+
+def preprocess_one_file_sharded(file, max_ent, max_v, pool, shard_size, batch_size=BATCH_SIZE, vso_capacity=None,
+                                model=DEFAULT_MODEL, cache=None, window=64, profile_dir=None,
+                                segmentation=DEFAULT_SEGMENTATION, max_para_chars=MAX_PARA_CHARS,
+                                checkpoint_dir=None, lexical=None, dedup=0, boilerplate=False,
+                                instruments=None) -> Tuple[float, float, Tuple, Tuple, CorpusStats]:
+    """
+    the same as preprocess_one_file, but the paragraphs are split into shards of 'shard_size' paragraphs which are
+    preprocessed by the processes of 'pool'. the statistics of the shards are merged in file order, so the output
+    is identical to preprocess_one_file for any number of shards (and both share the entries of the cache).
+    the timers and counters of the shards are added to 'instruments' (see preprocess_one_file).
+    """
+    instruments = instruments or get_instruments()
+
+    def preprocess_stream(paragraphs):
+        shards = shard_paragraphs(paragraphs, shard_size)
+        task = partial(preprocess_shard, batch_size=batch_size, vso_capacity=vso_capacity, model=model,
+                       profile_dir=profile_dir, lexical=lexical, dedup=dedup, cache_dir=cache and cache.directory,
+                       cache_size=cache and cache.max_size_mb)
+        stats = CorpusStats(vso_capacity)
+        for shard_stats, shard_instruments in ordered_imap(pool, task, shards, window, instruments):
+            with instruments.timer('merge'):
+                stats.merge(shard_stats)
+            instruments.merge(Instruments.from_dict(shard_instruments))
+        return stats
+
+    def preprocess():
+        return preprocess_file(file, model, config, checkpoint_dir, preprocess_stream)
+    config = file_config(vso_capacity, segmentation, max_para_chars, lexical, boilerplate)
+    return summarise_file(cached_stats(file, model, config, cache, preprocess, instruments), max_ent, max_v)
+
+
+def get_vso_one_file(stats: CorpusStats, top_verb, max_tr) -> List[Tuple]:
+    """
+    for a single file, get the target vso triples (most common vso triples for target verbs).
+    the candidate triples of all the verbs were counted by preprocess_one_file, here the ones of the target verbs
+    (and of 'by', as merge_into_vso keeps them too) are picked out into stats.vso_counts, nothing is parsed.
+    """
+    target_verb = set()
     for i in top_verb:
-        target_verb.append(i[0])
-    for sent in sentences:
-        sent_obj = VsoGenerator(sent, target_verb)
-        VsoGenerator.get_vso_all_text(sent_obj)
-    vso_triples = VsoGenerator.vso_counts.most_common(max_tr)
+        target_verb.add(i[0])
+    target_verb.add('by')
+    stats.vso_counts.update(stats.vso_candidates.select(target_verb))
+    vso_triples = stats.vso_counts.most_common(max_tr)
     return vso_triples
 
 
-def clear_up_data():
-    """reset the class variables to save memory, and to avoid disturbing each other when using multiprocessing."""
-    Preprocessor.reset()
-    VsoGenerator.reset()
+def analyse_one_file(file, max_ent, max_v, max_tr, batch_size=BATCH_SIZE, n_process=1, vso_capacity=None,
+                     model=DEFAULT_MODEL, cache_dir=None, cache_size=CACHE_SIZE_MB, profile_dir=None,
+                     segmentation=DEFAULT_SEGMENTATION, max_para_chars=MAX_PARA_CHARS,
+                     checkpoint_dir=None, lexical=None, dedup=0, boilerplate=False) -> FileReport:
+    """
+    preprocess a single file and get its vso triples in the same process. the candidate vso triples never leave
+    the process, only the averages, the most common entities, verbs and vso triples are returned in a FileReport,
+    together with the peak memory of the process (see peak_rss), whether the statistics came from the parse cache
+    in 'cache_dir' and the timers and counters of the task (profiled into 'profile_dir' if given).
+    """
+    instruments = Instruments()
+    with recording(instruments), profiled(profile_dir):
+        cache = ParseCache(cache_dir, cache_size) if cache_dir else None
+        avg_word_len, avg_sent_len, top_ent, top_verb, stats = preprocess_one_file(file, max_ent, max_v, batch_size,
+                                                                                   n_process, vso_capacity, model,
+                                                                                   cache, segmentation,
+                                                                                   max_para_chars, checkpoint_dir,
+                                                                                   lexical, dedup, boilerplate,
+                                                                                   instruments)
+        with instruments.timer('get_vso_one_file'):
+            vso_triples = get_vso_one_file(stats, top_verb, max_tr)
+    instruments.count('files')
+    return FileReport(file, avg_word_len, avg_sent_len, top_ent, top_verb, vso_triples, peak_rss(),
+                      cache_status(cache), instruments.to_dict())
+
+
+def analyse_one_file_sharded(file, max_ent, max_v, max_tr, pool, shard_size, batch_size=BATCH_SIZE,
+                             vso_capacity=None, model=DEFAULT_MODEL, cache_dir=None, cache_size=CACHE_SIZE_MB,
+                             profile_dir=None, segmentation=DEFAULT_SEGMENTATION,
+                             max_para_chars=MAX_PARA_CHARS, checkpoint_dir=None, lexical=None, dedup=0,
+                             boilerplate=False) -> FileReport:
+    """
+    the same as analyse_one_file, but the file is preprocessed in shards by 'pool' (see preprocess_one_file_sharded).
+    the vso triples are picked in this process as soon as the file is done, so the candidate triples of only one
+    file are kept at a time.
+    """
+    instruments = Instruments()
+    with recording(instruments), profiled(profile_dir):
+        cache = ParseCache(cache_dir, cache_size) if cache_dir else None
+        summary = preprocess_one_file_sharded(file, max_ent, max_v, pool, shard_size, batch_size, vso_capacity, model,
+                                              cache, profile_dir=profile_dir, segmentation=segmentation,
+                                              max_para_chars=max_para_chars, checkpoint_dir=checkpoint_dir,
+                                              lexical=lexical, dedup=dedup, boilerplate=boilerplate,
+                                              instruments=instruments)
+        avg_word_len, avg_sent_len, top_ent, top_verb, stats = summary
+        with instruments.timer('get_vso_one_file'):
+            vso_triples = get_vso_one_file(stats, top_verb, max_tr)
+    instruments.count('files')
+    return FileReport(file, avg_word_len, avg_sent_len, top_ent, top_verb, vso_triples, peak_rss(),
+                      cache_status(cache), instruments.to_dict())
+
+
+def cache_status(cache: Optional[ParseCache]) -> Optional[str]:
+    """'hit' if the statistics of the file came from the parse cache, 'miss' if not, None without a cache."""
+    if cache is None:
+        return None
+    return 'hit' if cache.hits else 'miss'
+
+
+def peak_rss(children=False) -> float:
+    """
+    the peak resident memory of this process so far, or of its largest finished child process (e.g. the workers of
+    a closed Pool), in MB (ru_maxrss is in kilobytes on Linux).
+    """
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
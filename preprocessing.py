@@ -22,40 +22,78 @@
 # 3. lemmatization
 # 4. dependency parsing
 # 5. named entity recognition
-# 6. computer the average sentence length and word length
+# 6. collect the candidate VSO triples of every sentence for all the verbs, so that a text is only parsed once
+# 7. computer the average sentence length and word length
+# 8. count sentences, tokens, characters and verbs in one pass over an array of the token attributes
+# 9. count verbs and named entities by their hash ids with NumPy, turning only the distinct ones into strings
+# 10. get the candidate VSO triples of many paragraphs at once from the same arrays (see VSO_chunks.extract_vso)
 
 
-import spacy
 from typing import List, Tuple
 from collections import Counter
+from functools import cached_property
+import numpy as np
+from VSO_chunks import extract_vso, get_noun_chunks
+from models import get_nlp, DEFAULT_MODEL
+from instrumentation import timed
 
-nlp = spacy.load("en_core_web_sm")
+
+# the token attributes exported once per paragraph by Doc.to_array, and their columns
+TOKEN_ATTRS = ("SENT_START", "LENGTH", "POS", "LEMMA", "IDX", "ENT_IOB", "ENT_TYPE", "HEAD", "DEP")
+SENT_START, LENGTH, POS, LEMMA, IDX, ENT_IOB, ENT_TYPE, HEAD, DEP = range(len(TOKEN_ATTRS))
+# ENT_IOB values: 1 inside, 2 outside, 3 beginning of an entity
+IOB_INSIDE, IOB_BEGIN = 1, 3
 
 
 class Preprocessor:
-    """The preprocessor class contains the paragraph and some metadata on that paragraph."""
-    ner_counts = Counter()
-    verb_counts = Counter()
-    sentence_list = []
-    sent_sum = 0
-    token_sum = 0
-    char_sum = 0
-
-    def __init__(self, paragraph):
+    """
+    The preprocessor class contains the paragraph and some metadata on that paragraph.
+    :param paragraph: the paragraph text.
+    :param doc: the paragraph already parsed by spaCy (e.g. yielded by nlp.pipe), otherwise it is parsed here.
+    :param model: the name of the spaCy model to parse the paragraph with.
+    The numbers of sentences, tokens and characters (and the verbs, see get_verb) come from a single array of the
+    token attributes, the sentences as strings and the (token, lemma, dependency) tuples are only made when they are
+    asked for.
+    """
+
+    def __init__(self, paragraph, doc=None, model=DEFAULT_MODEL):
         self.paragraph = paragraph
-        self.doc = nlp(self.paragraph)
-        self.sentences = self.split_into_sentences()
-        self.number_sent = len(self.sentences)
-        self.tok_lem_dep = self._parse_token_lemma_dependency()[0]
-        self.number_token = len(self.tok_lem_dep)
-        self.number_char = self._parse_token_lemma_dependency()[1]
+        self.doc = doc if doc is not None else get_nlp(model)(self.paragraph)
+        self.token_array = self.doc.to_array(TOKEN_ATTRS)
+        self.number_token = len(self.token_array)
+        # the first token always starts a sentence, as in doc.sents
+        self.number_sent = int((self.token_array[1:, SENT_START] == 1).sum()) + 1 if self.number_token else 0
+        self.number_char = int(self.token_array[:, LENGTH].sum())
+
+    @cached_property
+    def chunks(self) -> List[List[Tuple]]:
+        """the noun chunks of every sentence, made on first use (they need the dependency parse)."""
+        return self.get_sentence_chunks()
+
+    @cached_property
+    def sentences(self) -> List:
+        """the sentences of the paragraph as strings, made on first use."""
+        return self.split_into_sentences()
+
+    @cached_property
+    def tok_lem_dep(self) -> List[Tuple]:
+        """the (token, lemma, dependency) tuples of the paragraph, made on first use."""
+        return self._parse_token_lemma_dependency()[0]
 
     def split_into_sentences(self) -> List:
         """Split a paragraph into a list of sentences."""
         sentences = [sent.text.strip() for sent in self.doc.sents]
-        Preprocessor.sentence_list.extend(sentences)
         return sentences
 
+    def get_sentence_chunks(self) -> List[List[Tuple]]:
+        """
+        get the noun chunks of each sentence from the parse we already have, instead of parsing the sentences
+        again when generating the VSO triples.
+        """
+        chunks = [get_noun_chunks(sent) for sent in self.doc.sents]
+        return chunks
+
+    @timed('tok_lem_dep')
     def _parse_token_lemma_dependency(self) -> Tuple:
         """get tokens, lemmas and dependency for each word in a paragraph."""
         tok_lem_dep = tuple()
@@ -68,42 +106,117 @@ class Preprocessor:
                 char_num += len(token.text)
         return tld, char_num
 
-    @classmethod
-    def get_ner(cls, self) -> Counter:
-        """get the most common 15 named entities."""
-        ent_lab = tuple()
-        for ent in self.doc.ents:
-            ent_lab = ent.text, ent.label_
-            cls.ner_counts[ent_lab] += 1
-        return cls.ner_counts
-
-    @classmethod
-    def get_verb(cls, self) -> Counter:
-        """get the count for all the verbs."""
-        for token in self.doc:
-            if token.pos_ == "VERB":
-                cls.verb_counts[token.lemma_] += 1
-        return cls.verb_counts
-
-    @classmethod
-    def get_sum_token_sent_char(cls, self):
-        """computer the sum for the number of all the sentences, tokens and characters."""
-        cls.sent_sum += self.number_sent
-        cls.token_sum += self.number_token
-        cls.char_sum += self.number_char
-        return cls.sent_sum, cls.token_sum, cls.char_sum
-
-    @classmethod
-    def reset(cls):
+    @timed('get_ner')
+    def get_ner(self, ner_counts=None) -> Counter:
+        """count the named entities of the paragraph, into 'ner_counts' if given."""
+        if ner_counts is None:
+            ner_counts = Counter()
+        iob = self.token_array[:, ENT_IOB]
+        labels = self.token_array[:, ENT_TYPE]
+        # the same spans as doc.ents: an entity starts at a labelled B token and ends before the next token
+        # which is not I, without making a Span object for each of them
+        starts = np.flatnonzero((iob == IOB_BEGIN) & (labels != 0))
+        if not len(starts):
+            return ner_counts
+        boundaries = np.append(np.flatnonzero(iob != IOB_INSIDE), len(iob))
+        lasts = boundaries[np.searchsorted(boundaries, starts, side='right')] - 1
+        begin_chars = self.token_array[starts, IDX].tolist()
+        end_chars = (self.token_array[lasts, IDX] + self.token_array[lasts, LENGTH]).tolist()
+        text = self.doc.text
+        strings = self.doc.vocab.strings
+        ner_counts.update((text[begin:end], strings[label])
+                          for begin, end, label in zip(begin_chars, end_chars, labels[starts].tolist()))
+        return ner_counts
+
+    @timed('get_verb')
+    def get_verb(self, verb_counts=None) -> Counter:
+        """count the verbs of the paragraph, into 'verb_counts' if given."""
+        return count_verbs([self.token_array], self.doc.vocab.strings, verb_counts)
+
+    def get_sum_token_sent_char(self, stats):
+        """add the number of sentences, tokens and characters of the paragraph to the sums of 'stats' (CorpusStats)."""
+        stats.sent_sum += self.number_sent
+        stats.token_sum += self.number_token
+        stats.char_sum += self.number_char
+        return stats.sent_sum, stats.token_sum, stats.char_sum
+
+    def get_vso_candidates(self, vso_candidates=None) -> Counter:
         """
-        empty the class variables to save memory and to avoid potential interferences among different file objects
+        count the VSO triples of all the verbs in the paragraph, into 'vso_candidates' if given. the triples of the
+        most common verbs are picked out of them once the verbs of the whole text are counted.
+        """
+        return count_vso([self.token_array], [self.doc.text], self.doc.vocab.strings, vso_candidates)
+
+    def update_stats(self, stats, verbs=True, ents=True, vso=True):
         """
-        cls.ner_counts.clear()
-        cls.verb_counts.clear()
-        cls.sentence_list = []
-        cls.sent_sum = 0
-        cls.token_sum = 0
-        cls.char_sum = 0
+        add everything we know about the paragraph to 'stats' (CorpusStats).
+        'verbs' is False when the caller counts the verbs of many paragraphs together (see count_verbs), 'ents' and
+        'vso' are False when the doc does not have the named entities or the dependency parse (lexical pipeline).
+        """
+        if ents:
+            self.get_ner(stats.ner_counts)
+        if verbs:
+            self.get_verb(stats.verb_counts)
+        self.get_sum_token_sent_char(stats)
+        if vso:
+            self.get_vso_candidates(stats.vso_candidates)
+        return stats
+
+
+def first_seen_counts(ids: np.ndarray) -> Tuple[List[int], List[int]]:
+    """the distinct ids of an array in the order they first occur in it, and how often each of them occurs."""
+    unique, first, counts = np.unique(ids, return_index=True, return_counts=True)
+    order = np.argsort(first)
+    return unique[order].tolist(), counts[order].tolist()
+
+
+@timed('count_verbs')
+def count_verbs(token_arrays: List[np.ndarray], strings, verb_counts=None) -> Counter:
+    """
+    count the verbs in the token arrays (Preprocessor.token_array) of one or more paragraphs, in text order, into
+    'verb_counts' if given. the lemma hash ids are counted with numpy and only the distinct lemmas are looked up in
+    the StringStore 'strings', in the order they first occur, so the Counter is the same as counting token by token
+    (including the order of ties in most_common).
+    """
+    if verb_counts is None:
+        verb_counts = Counter()
+    if not token_arrays:
+        return verb_counts
+    array = token_arrays[0] if len(token_arrays) == 1 else np.concatenate(token_arrays)
+    lemmas = array[array[:, POS] == strings["VERB"], LEMMA]
+    lemmas, numbers = first_seen_counts(lemmas)
+    verb_counts.update({strings[lemma]: number for lemma, number in zip(lemmas, numbers)})
+    return verb_counts
+
+
+@timed('vso_candidates')
+def count_vso(token_arrays: List[np.ndarray], texts: List[str], strings, vso_candidates=None) -> Counter:
+    """
+    count the VSO triples of all the verbs in the token arrays of one or more paragraphs and their texts, in text
+    order, into 'vso_candidates' if given. the triples are the same as the ones of VsoGenerator, but they are found
+    on the arrays of all the paragraphs at once (see VSO_chunks.extract_vso) and the lemma of every distinct verb is
+    looked up in the StringStore 'strings' only once.
+    """
+    if vso_candidates is None:
+        vso_candidates = Counter()
+    if not token_arrays:
+        return vso_candidates
+    if len(token_arrays) == 1:
+        array, text = token_arrays[0], texts[0]
+    else:
+        array = np.concatenate(token_arrays)
+        lengths = [len(token_array) for token_array in token_arrays]
+        # the token offsets refer to the joined text, and every paragraph starts a sentence
+        offsets = np.cumsum([0] + [len(paragraph) for paragraph in texts[:-1]])
+        array[:, IDX] += np.repeat(offsets, lengths).astype(array.dtype)
+        starts = np.cumsum([0] + lengths[:-1])
+        array[starts[np.array(lengths) > 0], SENT_START] = 1
+        text = ''.join(texts)
+    columns = [array[:, column] for column in (SENT_START, POS, LEMMA, IDX, LENGTH, HEAD, DEP)]
+    triples = extract_vso(text, strings, *columns)
+    verbs = {verb: strings[verb] for verb in {verb for verb, _, _ in triples}}
+    vso_candidates.update([(verbs[verb], subject, obj) for verb, subject, obj in triples])
+    return vso_candidates
 
 
 def computer_average(a, b):
@@ -111,7 +224,10 @@ def computer_average(a, b):
     a function for compute the average word number of the sentences or every character number of the words,
     given 'a' as the total number of words or characters,
     and given 'b' as the total number of sentences or words.
+    None if there are no sentences or words (e.g. an empty file), which the output shows as MISSING.
     """
+    if not b:
+        return None
     return round(a/b, 3)
 
 
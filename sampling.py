@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> a quick approximate comparison, parsing only a sample of the paragraphs of a file
+# 1. draw the sample while reading the file: reservoir sampling, or stratified over the parts of the file
+# 2. parse only the sampled paragraphs, keeping the statistics of every one of them
+# 3. confidence intervals for the averages and the stability of the most common entities and verbs (bootstrap)
+
+import random
+from collections import Counter
+from functools import reduce
+from itertools import chain, islice
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from corpus_stats import CorpusStats
+from instrumentation import Instruments, get_instruments, recording
+from models import get_nlp, get_lexical_nlp, DEFAULT_MODEL
+from paragraph_sentence_gen import (drop_boilerplate, generate_para_offsets, limit_length, DEFAULT_SEGMENTATION,
+                                    MAX_PARA_CHARS)
+from parsing_file import get_vso_one_file, peak_rss, preprocess_docs, summarise_file, BATCH_SIZE, FileReport
+
+SAMPLE_METHODS = ('reservoir', 'stratified')
+# the number of bootstrap resamples of the sampled paragraphs, and the level of the confidence intervals
+BOOTSTRAP = 200
+CONFIDENCE = 0.95
+# the stability of a top-k list is estimated among the 'TOP_CANDIDATES * k' most common keys of the sample
+TOP_CANDIDATES = 10
+
+
+def reservoir_sample(paragraphs: Iterable[Tuple], size, rng: random.Random) -> Tuple[List[Tuple], int]:
+    """
+    a uniform random sample of 'size' items of a stream read once (reservoir sampling, algorithm R), in the order
+    of the stream, and the number of items in the stream.
+    """
+    reservoir = []
+    number = 0
+    for number, item in enumerate(paragraphs, 1):
+        if len(reservoir) < size:
+            reservoir.append((number, item))
+        else:
+            i = rng.randrange(number)
+            if i < size:
+                reservoir[i] = (number, item)
+    return [item for _, item in sorted(reservoir, key=lambda pair: pair[0])], number
+
+
+def stratified_sample(paragraphs: Iterable, size, number, rng: random.Random) -> List:
+    """
+    a sample of one paragraph out of every of 'size' parts (strata) of the 'number' paragraphs of the file, every
+    part with the same number of consecutive paragraphs, so the sample is spread over the whole file (e.g. all the
+    chapters of a book) and every paragraph has the same chance to be in it.
+    """
+    chosen = {}
+    seen = {}
+    for i, item in enumerate(paragraphs):
+        stratum = i * size // number
+        seen[stratum] = seen.get(stratum, 0) + 1
+        # a reservoir of one paragraph per stratum
+        if rng.randrange(seen[stratum]) == 0:
+            chosen[stratum] = item
+    return [chosen[stratum] for stratum in sorted(chosen)]
+
+
+def sample_paragraphs(file, size, method='reservoir', seed=0, segmentation=DEFAULT_SEGMENTATION,
+                      boilerplate=False) -> Tuple[List, int]:
+    """
+    the sampled paragraphs of the file, in file order, and the number of paragraphs in the file. the stratified
+    sample reads the file twice, first to count the paragraphs.
+    with 'boilerplate' the header and the footer of Project Gutenberg are not sampled (see drop_boilerplate).
+    """
+    def paragraphs():
+        items = generate_para_offsets(file, segmentation)
+        return drop_boilerplate(items) if boilerplate else items
+    rng = random.Random(seed)
+    if method == 'stratified':
+        number = sum(1 for _ in paragraphs())
+        sample = stratified_sample(paragraphs(), min(size, number), number, rng)
+    else:
+        sample, number = reservoir_sample(paragraphs(), size, rng)
+    return [text for text, _, _ in sample], number
+
+
+def preprocess_sample(paragraphs: List[str], batch_size=BATCH_SIZE, vso_capacity=None, model=DEFAULT_MODEL,
+                      max_para_chars=MAX_PARA_CHARS, lexical=None, instruments=None) -> List[CorpusStats]:
+    """
+    the statistics of every sampled paragraph on its own (of all its pieces, if it is split, see limit_length).
+    'lexical' and 'instruments' are the same as for parsing_file.preprocess_paragraphs.
+    """
+    instruments = instruments or get_instruments()
+    pieces = [list(limit_length(paragraph, max_para_chars)) for paragraph in paragraphs]
+    nlp = get_nlp(model) if lexical is None else get_lexical_nlp(model, lexical)
+    docs = instruments.timed_iter('spacy', nlp.pipe(chain.from_iterable(pieces), batch_size=batch_size))
+    return [preprocess_docs(islice(docs, len(group)), nlp.vocab.strings, batch_size, vso_capacity, lexical,
+                            instruments) for group in pieces]
+
+
+def bootstrap_weights(number, seed=0, resamples=BOOTSTRAP) -> np.ndarray:
+    """how often every one of 'number' paragraphs is drawn in every bootstrap resample, shape (resamples, number)."""
+    rng = np.random.default_rng(seed)
+    return rng.multinomial(number, np.full(number, 1 / number), size=resamples)
+
+
+def ratio_interval(weights: np.ndarray, numerators, denominators, confidence=CONFIDENCE) -> List[float]:
+    """the percentile bootstrap confidence interval of sum(numerators) / sum(denominators)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = (weights @ np.asarray(numerators, dtype=float)) / (weights @ np.asarray(denominators, dtype=float))
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.nanpercentile(ratios, [tail, 100 - tail])
+    return [round(float(low), 3), round(float(high), 3)]
+
+
+def top_stability(weights: np.ndarray, counters: List, top: List[Tuple]) -> List[Tuple]:
+    """
+    for every key of the top-k list 'top' of the sample, the share of the bootstrap resamples in which it is in the
+    top-k list as well. ties are broken by the order of the sample's list, as in Counter.most_common.
+    """
+    k = len(top)
+    if not k:
+        return []
+    merged = Counter()
+    for counter in counters:
+        merged.update(counter)
+    keys = [key for key, _ in merged.most_common(TOP_CANDIDATES * k)]
+    index = {key: i for i, key in enumerate(keys)}
+    matrix = np.zeros((len(counters), len(keys)), dtype=np.int64)
+    for row, counter in enumerate(counters):
+        for key, number in counter.items():
+            if key in index:
+                matrix[row, index[key]] = number
+    counts = weights @ matrix
+    top_k = np.argsort(-counts, axis=1, kind='stable')[:, :k]
+    shares = np.bincount(top_k.ravel(), minlength=len(keys)) / len(weights)
+    return [(key, round(float(shares[index[key]]), 3)) for key, _ in top]
+
+
+def analyse_one_sample(file, max_ent, max_v, max_tr, sample_size, method='reservoir', seed=0, batch_size=BATCH_SIZE,
+                       vso_capacity=None, model=DEFAULT_MODEL, segmentation=DEFAULT_SEGMENTATION,
+                       max_para_chars=MAX_PARA_CHARS, lexical=None, boilerplate=False) -> FileReport:
+    """
+    analyse a sample of 'sample_size' paragraphs of the file (see sample_paragraphs) like analyse_one_file does the
+    whole file. the report also has the confidence intervals of the averages and the stability of the most common
+    entities and verbs in 'sample' (see sample_summary). with 'boilerplate' the header and the footer of Project
+    Gutenberg are not sampled.
+    """
+    instruments = Instruments()
+    with recording(instruments):
+        with instruments.timer('sample'):
+            paragraphs, population = sample_paragraphs(file, sample_size, method, seed, segmentation, boilerplate)
+        parts = preprocess_sample(paragraphs, batch_size, vso_capacity, model, max_para_chars, lexical, instruments)
+        stats = reduce(CorpusStats.merge, parts, CorpusStats(vso_capacity))
+        avg_word_len, avg_sent_len, top_ent, top_verb, stats = summarise_file(stats, max_ent, max_v)
+        with instruments.timer('get_vso_one_file'):
+            vso_triples = get_vso_one_file(stats, top_verb, max_tr)
+    summary = sample_summary(parts, avg_word_len, avg_sent_len, top_ent, top_verb, population, method, seed)
+    instruments.count('files')
+    return FileReport(file, avg_word_len, avg_sent_len, top_ent, top_verb, vso_triples, peak_rss(),
+                      instruments=instruments.to_dict(), sample=summary)
+
+
+def sample_summary(parts: List[CorpusStats], avg_word_len, avg_sent_len, top_ent, top_verb, population, method,
+                   seed) -> Dict:
+    """
+    how far the results of the sample can be trusted: the confidence intervals of the average word and sentence
+    length, and for the most common entities and verbs how often they stay in the top list when the sampled
+    paragraphs are resampled. if the sample is the whole file the results are exact.
+    """
+    summary = {'method': method, 'seed': seed, 'paragraphs': len(parts), 'population': population,
+               'confidence': CONFIDENCE}
+    if len(parts) >= population:
+        summary.update(avg_word_len_ci=[avg_word_len] * 2, avg_sent_len_ci=[avg_sent_len] * 2,
+                       ent_stability=[(key, 1.0) for key, _ in top_ent],
+                       verb_stability=[(key, 1.0) for key, _ in top_verb])
+        return summary
+    weights = bootstrap_weights(len(parts), seed)
+    summary.update(
+        avg_word_len_ci=ratio_interval(weights, [p.char_sum for p in parts], [p.token_sum for p in parts]),
+        avg_sent_len_ci=ratio_interval(weights, [p.token_sum for p in parts], [p.sent_sum for p in parts]),
+        ent_stability=top_stability(weights, [p.ner_counts for p in parts], top_ent),
+        verb_stability=top_stability(weights, [p.verb_counts for p in parts], top_verb))
+    return summary
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> a long running analysis service, so a comparison does not start processes and load the model every time
+# 1. a small HTTP server (on a TCP port or a unix socket) on the asyncio event loop
+# 2. the paragraphs of concurrent requests are parsed together in nlp.pipe batches
+# 3. the parsing runs in a pool of processes, each of them loads the spaCy model once, when it starts
+# 4. the comparison comes back as json or as the html table
+
+import asyncio
+import json
+import os
+from argparse import ArgumentParser
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial, reduce
+from itertools import chain, islice
+from typing import Dict, List, Tuple
+
+from corpus_stats import CorpusStats
+from models import get_nlp, DEFAULT_MODEL
+from output_sinks import render_html
+from paragraph_sentence_gen import text_paragraphs, DEFAULT_SEGMENTATION, MAX_PARA_CHARS
+from parsing_file import (analyse_one_file, get_vso_one_file, preprocess_docs, summarise_file, BATCH_SIZE,
+                          FileReport)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# how long (in seconds) a batch waits for the paragraphs of other requests before it is parsed
+MAX_DELAY = 0.01
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+def warm_up(model=DEFAULT_MODEL) -> None:
+    """load the model when a pool process starts, not with its first request."""
+    get_nlp(model)
+
+
+def preprocess_groups(groups: List[List[str]], batch_size=BATCH_SIZE, vso_capacity=None,
+                      model=DEFAULT_MODEL) -> List[CorpusStats]:
+    """
+    the task of a pool process: parse the paragraphs of several requests in one nlp.pipe stream and return the
+    statistics of every group of paragraphs on its own.
+    """
+    nlp = get_nlp(model)
+    docs = nlp.pipe(chain.from_iterable(groups), batch_size=batch_size)
+    return [preprocess_docs(islice(docs, len(group)), nlp.vocab.strings, batch_size, vso_capacity)
+            for group in groups]
+
+
+class Batcher:
+    """
+    Collect the paragraphs submitted by concurrent requests and parse them together: a batch is sent to the
+    'executor' as soon as it has 'batch_size' paragraphs or the first of them has waited 'max_delay' seconds.
+    Several batches can be parsed at the same time, one in every process of the executor.
+    """
+
+    def __init__(self, executor: Executor, batch_size=BATCH_SIZE, max_delay=MAX_DELAY, vso_capacity=None,
+                 model=DEFAULT_MODEL):
+        self.executor = executor
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.vso_capacity = vso_capacity
+        self.model = model
+        self.batches = 0
+        self._queue = None
+        self._tasks = set()
+
+    def start(self) -> None:
+        """start collecting batches, in the running event loop."""
+        self._queue = asyncio.Queue()
+        self._keep(asyncio.get_running_loop().create_task(self._collect()))
+
+    def _keep(self, task) -> None:
+        """keep a reference to a running task until it is done."""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def submit(self, paragraphs: List[str]) -> CorpusStats:
+        """the statistics of 'paragraphs', parsed in a batch together with the paragraphs of other requests."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((paragraphs, future))
+        return await future
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            size = len(items[0][0])
+            deadline = loop.time() + self.max_delay
+            while size < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                size += len(item[0])
+            self.batches += 1
+            # do not wait for the batch, the next one may go to another process
+            self._keep(loop.create_task(self._parse(items)))
+
+    async def _parse(self, items: List[Tuple]) -> None:
+        loop = asyncio.get_running_loop()
+        groups = [paragraphs for paragraphs, _ in items]
+        try:
+            results = await loop.run_in_executor(self.executor, preprocess_groups, groups, self.batch_size,
+                                                 self.vso_capacity, self.model)
+        except Exception as error:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), stats in zip(items, results):
+            if not future.done():
+                future.set_result(stats)
+
+
+class AnalysisService:
+    """
+    Analyse documents sent as text (parsed in shared batches, see Batcher) or as the path of a file on this machine
+    (analysed by analyse_one_file in a pool process), and answer with json or the html table.
+    The service only listens on this machine by default, as it reads any file it is asked for.
+    """
+
+    def __init__(self, executor: Executor, batcher: Batcher, segmentation=DEFAULT_SEGMENTATION,
+                 max_para_chars=MAX_PARA_CHARS):
+        self.executor = executor
+        self.batcher = batcher
+        self.segmentation = segmentation
+        self.max_para_chars = max_para_chars
+
+    async def analyse_text(self, name, text, max_ent, max_v, max_tr) -> FileReport:
+        """analyse a document given as text, its paragraphs are submitted to the batcher in pieces of a batch."""
+        paragraphs = list(text_paragraphs(text, self.segmentation, self.max_para_chars))
+        if not paragraphs:
+            raise ValueError(f"the document {name!r} has no text")
+        size = self.batcher.batch_size
+        parts = await asyncio.gather(*(self.batcher.submit(paragraphs[i:i + size])
+                                       for i in range(0, len(paragraphs), size)))
+        # merged in the order of the text, as if it was parsed in one piece
+        stats = reduce(CorpusStats.merge, parts, CorpusStats(self.batcher.vso_capacity))
+        avg_word_len, avg_sent_len, top_ent, top_verb, stats = summarise_file(stats, max_ent, max_v)
+        vso_triples = get_vso_one_file(stats, top_verb, max_tr)
+        return FileReport(name, avg_word_len, avg_sent_len, top_ent, top_verb, vso_triples)
+
+    async def analyse_file(self, file, max_ent, max_v, max_tr) -> FileReport:
+        """analyse a file on this machine in a pool process."""
+        if not os.path.isfile(file):
+            raise ValueError(f"there is no file {file!r}")
+        analyse = partial(analyse_one_file, batch_size=self.batcher.batch_size,
+                          vso_capacity=self.batcher.vso_capacity, model=self.batcher.model,
+                          segmentation=self.segmentation, max_para_chars=self.max_para_chars)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, analyse, file, max_ent, max_v, max_tr)
+
+    async def analyse(self, request: Dict) -> Tuple[str, str]:
+        """
+        answer a request, e.g. {"documents": [{"name": "a", "text": "..."}, {"file": "data/Politics.txt"}],
+        "max_ent": 15, "max_verb": 3, "max_triple": 15, "format": "json"}, with its content type and body.
+        """
+        max_ent = int(request.get('max_ent', 15))
+        max_v = int(request.get('max_verb', 3))
+        max_tr = int(request.get('max_triple', 15))
+        documents = request['documents']
+        if not documents:
+            raise ValueError("no documents to compare")
+        jobs = []
+        for i, document in enumerate(documents):
+            if 'file' in document:
+                jobs.append(self.analyse_file(document['file'], max_ent, max_v, max_tr))
+            else:
+                name = document.get('name', f'document {i + 1}')
+                jobs.append(self.analyse_text(name, document['text'], max_ent, max_v, max_tr))
+        reports = await asyncio.gather(*jobs)
+        if request.get('format', 'json') == 'html':
+            return 'text/html; charset=utf-8', render_html(reports, max_ent, max_v, max_tr)
+        return 'application/json', json.dumps({'reports': [report.to_dict() for report in reports]})
+
+    async def respond(self, method, path, body: bytes) -> Tuple[int, str, str]:
+        """the status, content type and body of the answer to an HTTP request."""
+        if path == '/health':
+            return 200, 'application/json', json.dumps({'status': 'ok', 'batches': self.batcher.batches})
+        if path != '/analyse':
+            return 404, 'application/json', json.dumps({'error': f'no such path: {path}'})
+        if method != 'POST':
+            return 405, 'application/json', json.dumps({'error': 'use POST'})
+        try:
+            content_type, answer = await self.analyse(json.loads(body or b'{}'))
+        except (ValueError, KeyError, TypeError) as error:
+            return 400, 'application/json', json.dumps({'error': str(error)})
+        return 200, content_type, answer
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """read one HTTP request from the connection, answer it and close the connection."""
+        try:
+            method, path, _ = (await reader.readline()).decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+            status, content_type, answer = await self.respond(method, path.split('?')[0], body)
+        except (ValueError, asyncio.IncompleteReadError) as error:
+            status, content_type, answer = 400, 'application/json', json.dumps({'error': str(error)})
+        except Exception as error:
+            status, content_type, answer = 500, 'application/json', json.dumps({'error': repr(error)})
+        payload = answer.encode('utf-8')
+        writer.write(f'HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: {content_type}\r\n'
+                     f'Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+def get_cli() -> ArgumentParser:
+    """Command line interface of the service."""
+    parser = ArgumentParser("service", description="Keep the spaCy model loaded and analyse the documents sent over "
+                                                   "HTTP (POST /analyse, see AnalysisService.analyse).")
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST, help="The address to listen on.")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="The TCP port to listen on.")
+    parser.add_argument('--unix', type=str, default=None, metavar='PATH',
+                        help="Listen on this unix socket instead of a TCP port.")
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1,
+                        help="The number of parsing processes.")
+    parser.add_argument('--batch-size', '-b', type=int, default=BATCH_SIZE,
+                        help="The number of paragraphs (of one or several requests) parsed together.")
+    parser.add_argument('--max-delay', type=float, default=MAX_DELAY, metavar='SECONDS',
+                        help="How long a batch waits for the paragraphs of other requests.")
+    parser.add_argument('--max-candidates', '-c', type=int, default=0,
+                        help="Keep at most this many candidate VSO triples per document (0: all of them), the "
+                             "triples are shown by their guaranteed count (see --max-candidates of main.py).")
+    parser.add_argument('--model', '-m', type=str, default=DEFAULT_MODEL, help="The spaCy model.")
+    return parser
+
+
+async def serve(args) -> None:
+    with ProcessPoolExecutor(args.workers, initializer=warm_up, initargs=(args.model,)) as executor:
+        # start the processes before listening, otherwise they inherit the sockets open when they are forked
+        await asyncio.get_running_loop().run_in_executor(executor, warm_up, args.model)
+        batcher = Batcher(executor, args.batch_size, args.max_delay, args.max_candidates or None, args.model)
+        batcher.start()
+        service = AnalysisService(executor, batcher)
+        if args.unix:
+            server = await asyncio.start_unix_server(service.handle, path=args.unix)
+        else:
+            server = await asyncio.start_server(service.handle, args.host, args.port)
+        print("* serving on", args.unix or f"http://{args.host}:{args.port}", "*")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    args = get_cli().parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -19,8 +19,19 @@
 # Task --> Test VSO_chunks module
 
 
+from collections import Counter
+from glob import glob
+from itertools import islice
 from unittest import TestCase, main
-from VSO_chunks import VsoGenerator
+import numpy as np
+from VSO_chunks import VsoGenerator, extract_vso, get_noun_chunks
+from models import get_nlp
+from paragraph_sentence_gen import generate_para
+from preprocessing import count_vso, Preprocessor, DEP, HEAD, IDX, LEMMA, LENGTH, POS, SENT_START
+
+# the paragraphs of the differential tests: the special cases above and the start of every bundled corpus
+PARAGRAPHS = ["I like apple and pear. The cake is made by my mother.",
+              "Paul Lesutis, who manages the investments at Provident Capital Management Inc., blames futures markets."]
 
 
 class LpTest(TestCase):
@@ -61,27 +72,59 @@ class LpTest(TestCase):
         self.assertEqual(result_2, target_2, "The target is a tuple with 3 elements, a verb, a subject, an object")
         self.assertEqual(result_3, target_3, "The target is a tuple with 3 elements, a verb, a subject, an object")
 
-    def test_output_get_vso_all_text(self):
-        sent_1 = 'I like apple and pear.'
-        s_1 = VsoGenerator(sent_1, "like")
-        VsoGenerator.get_vso_all_text(s_1)
-        sent_2 = "The cake is made by my mother."
-        s_2 = VsoGenerator(sent_2, "make")
-        VsoGenerator.get_vso_all_text(s_2)
-
-        self.assertIn(('like', 'I', 'apple'), dict(VsoGenerator.vso_counts))
-        self.assertIsInstance(VsoGenerator.vso_counts, object, "Required type is a Counter objects")
-        self.assertEqual(len(VsoGenerator.vso_counts), 2)
+    def test_output_reuse_parsed_sentence(self):
+        sent = "The cake is made by my mother."
+        from_text = VsoGenerator(sent, ["make"])
+        doc = get_nlp()(sent)
+        from_span = VsoGenerator(list(doc.sents)[0], ["make"])
+        from_chunks = VsoGenerator(None, ["make"], from_text.chunks)
+        self.assertIs(from_span.doc.doc, doc, "A parsed sentence should not be parsed again")
+        self.assertEqual(from_span.vso, from_text.vso)
+        self.assertEqual(from_chunks.vso, from_text.vso)
+
+    def test_output_all_verbs(self):
+        sent = "Paul Lesutis, who manages the investments at Provident Capital Management Inc., blames" \
+               " futures markets."
+        target = VsoGenerator(sent, ["manage", "blame"]).vso
+        result = VsoGenerator(sent, None).vso
+        self.assertEqual([triple for triple in result if triple[0] in ["manage", "blame"]], target,
+                         "Without target verbs the triples of all the verbs are kept")
 
-    def test_output_reset(self):
+    def test_output_get_vso_all_text(self):
         sent_1 = 'I like apple and pear.'
         s_1 = VsoGenerator(sent_1, "like")
-        VsoGenerator.get_vso_all_text(s_1)
+        vso_counts = s_1.get_vso_all_text()
         sent_2 = "The cake is made by my mother."
         s_2 = VsoGenerator(sent_2, "make")
-        VsoGenerator.get_vso_all_text(s_2)
-        VsoGenerator.reset()
-        self.assertEqual(len(VsoGenerator.vso_counts), 0)
+        s_2.get_vso_all_text(vso_counts)
+
+        self.assertIn(('like', 'I', 'apple'), dict(vso_counts))
+        self.assertIsInstance(vso_counts, object, "Required type is a Counter objects")
+        self.assertEqual(len(vso_counts), 2)
+
+    def test_output_extract_vso(self):
+        nlp = get_nlp()
+        paragraphs = PARAGRAPHS + [para for file in sorted(glob('data/*.txt'))
+                                   for para in islice(generate_para(file), 40)]
+        strings = nlp.vocab.strings
+        targets = ["like", "make", "manage", "say", "be", "have"]
+        target_ids = np.array([strings[verb] for verb in targets], dtype=np.uint64)
+        token_arrays, texts, target = [], [], []
+        for doc in nlp.pipe(paragraphs):
+            array = Preprocessor(doc.text, doc).token_array
+            columns = [array[:, column] for column in (SENT_START, POS, LEMMA, IDX, LENGTH, HEAD, DEP)]
+            for verbs, ids in ((None, None), (targets, target_ids)):
+                expected = [triple for sent in doc.sents
+                            for triple in VsoGenerator(sent, verbs, get_noun_chunks(sent)).vso]
+                result = [(strings[verb], subject, obj) for verb, subject, obj in
+                          extract_vso(doc.text, strings, *columns, target_ids=ids)]
+                self.assertEqual(result, expected, "The same triples in the same order as merge_into_vso")
+                if verbs is None:
+                    target.extend(expected)
+            token_arrays.append(array)
+            texts.append(doc.text)
+        result = count_vso(token_arrays, texts, strings)
+        self.assertEqual(list(result.items()), list(Counter(target).items()), "Many paragraphs at once")
 
 
 if __name__ == '__main__':
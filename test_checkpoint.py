@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+# Task --> Test checkpoint module
+
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+from checkpoint import checkpoint_file, load_checkpoint, prefix_hash
+from instrumentation import get_instruments
+from paragraph_sentence_gen import ReadState
+from parsing_file import preprocess_one_file
+
+
+class LpTest(TestCase):
+    """
+    incremental analysis non-functional tests
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file = os.path.join(self.directory, 'log.txt')
+        self.checkpoints = os.path.join(self.directory, 'checkpoints')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, text):
+        with open(self.file, 'w', encoding='utf-8') as otf:
+            otf.write(text)
+
+    def test_output_append(self):
+        text = 'I like apple and pear.\n\nI eat apple. He drinks\norange juice.\n\nWe like the weather.'
+        self.write(text)
+        preprocess_one_file(self.file, 15, 3, checkpoint_dir=self.checkpoints)
+        # the last paragraph goes on and a new one is appended
+        self.write(text + ' He likes it.\n\nShe eats pear.\n')
+        get_instruments().reset()
+        result = preprocess_one_file(self.file, 15, 3, checkpoint_dir=self.checkpoints)
+        self.assertEqual(get_instruments().counters['docs'], 2, "Only the last and the new paragraph are parsed")
+        target = preprocess_one_file(self.file, 15, 3)
+        self.assertEqual(result[:4], target[:4], "The same results as parsing the whole file")
+        self.assertEqual(result[4].to_dict(), target[4].to_dict())
+
+    def test_output_no_blank_lines(self):
+        line = 'I eat apple. He drinks orange juice.\n'
+        self.write(line * 20)
+        preprocess_one_file(self.file, 15, 3, max_para_chars=60, checkpoint_dir=self.checkpoints)
+        self.write(line * 22)
+        get_instruments().reset()
+        result = preprocess_one_file(self.file, 15, 3, max_para_chars=60, checkpoint_dir=self.checkpoints)
+        self.assertEqual(get_instruments().counters['docs'], 2, "Only the new lines and the piece before are parsed")
+        target = preprocess_one_file(self.file, 15, 3, max_para_chars=60)
+        self.assertEqual(result[:4], target[:4], "The same results as parsing the whole file")
+        self.assertEqual(result[4].to_dict(), target[4].to_dict())
+
+    def test_output_edited(self):
+        self.write('I like apple and pear.\n\nI eat apple.\n')
+        preprocess_one_file(self.file, 15, 3, checkpoint_dir=self.checkpoints)
+        config = {'vso_capacity': None, 'segmentation': 'blank-line', 'max_para_chars': 10000}
+        path = checkpoint_file(self.checkpoints, self.file, 'en_core_web_sm', config)
+        state = load_checkpoint(path, self.file)[1]
+        self.assertEqual((state.offset, state.text), (36, 'I eat apple.'), "Parsing goes on after the last line")
+        self.write('I love apple and pear.\n\nI eat apple.\n')
+        self.assertEqual(load_checkpoint(path, self.file), (None, ReadState(0)), "An edited file is parsed again")
+        self.assertEqual(prefix_hash(self.file, 0), prefix_hash(os.devnull, 0))
+
+
+if __name__ == '__main__':
+    main()
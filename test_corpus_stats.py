@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> Test corpus_stats module
+
+
+import json
+import pickle
+from collections import Counter
+from unittest import TestCase, main
+import corpus_stats
+from corpus_stats import CorpusStats, InternedCounter, SpaceSaving, StringTable
+
+
+def make_stats(ents, verbs, sents, tokens, chars):
+    stats = CorpusStats()
+    stats.ner_counts.update(ents)
+    stats.verb_counts.update(verbs)
+    stats.vso_candidates.update([(verb, 'I', 'apple') for verb in verbs])
+    stats.sent_sum, stats.token_sum, stats.char_sum = sents, tokens, chars
+    return stats
+
+
+class LpTest(TestCase):
+    """
+    CorpusStats non-functional tests
+    """
+
+    def setUp(self):
+        self.parts = [make_stats([('London', 'GPE')], ['eat', 'like'], 1, 5, 18),
+                      make_stats([('Darcy', 'PERSON'), ('London', 'GPE')], ['like'], 2, 9, 40),
+                      make_stats([('Darcy', 'PERSON')], ['drink', 'eat', 'eat'], 3, 12, 51)]
+
+    def test_output_merge(self):
+        result = CorpusStats().merge(self.parts[0]).merge(self.parts[1]).merge(self.parts[2])
+        self.assertEqual(result.ner_counts, Counter({('London', 'GPE'): 2, ('Darcy', 'PERSON'): 2}))
+        self.assertEqual(result.verb_counts.most_common(), [('eat', 3), ('like', 2), ('drink', 1)])
+        self.assertEqual((result.sent_sum, result.token_sum, result.char_sum), (6, 26, 109))
+        self.assertEqual(result.vso_candidates[('eat', 'I', 'apple')], 3)
+
+    def test_output_merge_associative(self):
+        left = CorpusStats().merge(CorpusStats().merge(self.parts[0]).merge(self.parts[1])).merge(self.parts[2])
+        right = CorpusStats().merge(self.parts[0]).merge(CorpusStats().merge(self.parts[1]).merge(self.parts[2]))
+        self.assertEqual(left.to_dict(), right.to_dict())
+        self.assertEqual(left.ner_counts.most_common(), right.ner_counts.most_common(), "Ties keep their order")
+
+    def test_output_to_dict_from_dict(self):
+        stats = CorpusStats().merge(self.parts[0]).merge(self.parts[1])
+        result = CorpusStats.from_dict(json.loads(json.dumps(stats.to_dict())))
+        self.assertEqual(result.ner_counts, stats.ner_counts)
+        self.assertEqual(result.vso_candidates.most_common(), stats.vso_candidates.most_common())
+        self.assertEqual(result.to_dict(), stats.to_dict())
+
+    def test_output_space_saving(self):
+        counts = SpaceSaving(3)
+        counts.update(['a', 'b', 'a', 'c', 'a', 'b'])
+        counts.update(['d'])
+        self.assertEqual(len(counts), 3, "Not more keys than the capacity are kept")
+        self.assertNotIn('c', counts, "The key with the lowest count is replaced")
+        self.assertEqual(counts.most_common(2), [('a', 3), ('b', 2)])
+        self.assertEqual(dict(counts.items())['d'], 2, "The new key takes over the count of the replaced one")
+        counts.update({'a': 5, 'e': 1})
+        self.assertEqual(counts.most_common(1), [('a', 8)])
+
+    def test_output_space_saving_errors(self):
+        keys = [(verb, 'I', 'it') for verb in ['eat'] * 30 + ['like'] * 20 + ['see'] * 5 + ['give']]
+        counts = SpaceSaving(3)
+        counts.update(keys)
+        self.assertEqual(dict(counts.items())[('give', 'I', 'it')], 6, "The count of a new key is too high")
+        result = counts.select(['eat', 'give'])
+        self.assertEqual(result, {('eat', 'I', 'it'): 30, ('give', 'I', 'it'): 1}, "The guaranteed counts")
+        stats = CorpusStats(vso_capacity=3)
+        stats.vso_candidates.update(keys[:55])
+        other = CorpusStats(vso_capacity=3)
+        other.vso_candidates.update(keys[55:])
+        stats.merge(other)
+        self.assertEqual(stats.vso_candidates.errors, counts.errors, "The errors are merged with the counts")
+        result = CorpusStats.from_dict(json.loads(json.dumps(stats.to_dict())))
+        self.assertEqual(result.vso_candidates.select(['give']), {('give', 'I', 'it'): 1})
+
+    def test_output_space_saving_stats(self):
+        stats = CorpusStats(vso_capacity=2).merge(self.parts[0]).merge(self.parts[2])
+        self.assertEqual(len(stats.vso_candidates), 2)
+        self.assertEqual(stats.vso_candidates.most_common(1), [(('eat', 'I', 'apple'), 3)])
+        result = CorpusStats.from_dict(json.loads(json.dumps(stats.to_dict())))
+        self.assertEqual(result.vso_candidates.capacity, 2)
+        self.assertEqual(result.vso_candidates.most_common(), stats.vso_candidates.most_common())
+
+    def test_output_interned_counter(self):
+        keys = [('like', 'I', 'apple'), ('eat', 'I', 'pear'), ('like', 'we', 'apple'), ('eat', 'I', 'pear'),
+                ('like', 'I', 'apple'), ('be', 'it', 'é'), ('eat', 'he', 'pear')]
+        target = Counter(keys)
+        counts = InternedCounter(StringTable(), 3)
+        counts.update(keys[:4])
+        counts.update(Counter(keys[4:]))
+        self.assertEqual(counts, target)
+        self.assertEqual(counts.most_common(), target.most_common(), "Ties in the order the keys first occur")
+        self.assertEqual(counts.most_common(2), target.most_common(2))
+        self.assertEqual(counts[('eat', 'I', 'pear')], 2)
+        self.assertEqual(counts[('eat', 'you', 'pear')], 0)
+        counts[('eat', 'I', 'pear')] += 3
+        self.assertEqual(counts.most_common(1), [(('eat', 'I', 'pear'), 5)])
+        self.assertEqual(list(counts.select(['like', 'be']).items()),
+                         [(('like', 'I', 'apple'), 2), (('like', 'we', 'apple'), 1), (('be', 'it', 'é'), 1)])
+        self.assertEqual(len(counts.strings), 10, "Every string is stored once")
+        result = pickle.loads(pickle.dumps(counts))
+        self.assertEqual(result.most_common(), counts.most_common())
+
+    def test_output_interned_counter_compact(self):
+        old = corpus_stats.COMPACT_ROWS
+        corpus_stats.COMPACT_ROWS = 4
+        try:
+            words = ['say', 'go', 'say', 'make', 'go', 'say', 'take', 'go', 'make', 'be'] * 3
+            counts = InternedCounter()
+            for word in words:
+                counts.update([word])
+            self.assertLess(len(counts._counts), 2 * 5 + 1, "The rows of the same key are merged")
+            self.assertEqual(counts.most_common(), Counter(words).most_common())
+        finally:
+            corpus_stats.COMPACT_ROWS = old
+
+    def test_output_pickle(self):
+        stats = CorpusStats().merge(self.parts[0]).merge(self.parts[1]).merge(self.parts[2])
+        result = pickle.loads(pickle.dumps(stats))
+        self.assertIs(result.ner_counts.strings, result.verb_counts.strings, "The counters share the string table")
+        self.assertEqual(result.to_dict(), stats.to_dict())
+        self.assertEqual(result.merge(self.parts[0]).verb_counts.most_common(1), [('eat', 4)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+# Task --> Test instrumentation module
+
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+from instrumentation import Instruments, get_instruments, timed, profiled, recording
+from parsing_file import analyse_one_file
+
+
+@timed('square')
+def square(x):
+    return x * x
+
+
+class LpTest(TestCase):
+    """
+    Instruments non-functional tests
+    """
+
+    def test_output_timer_count(self):
+        instruments = Instruments()
+        with instruments.timer('stage'):
+            pass
+        instruments.count('docs')
+        instruments.count('docs', 2)
+        self.assertEqual(instruments.counters['docs'], 3)
+        self.assertGreaterEqual(instruments.timers['stage'], 0)
+        self.assertEqual(list(instruments.timed_iter('wait', [1, 2, 3])), [1, 2, 3])
+        self.assertIn('wait', instruments.timers)
+
+    def test_output_merge_to_dict(self):
+        first, second = Instruments(), Instruments()
+        first.count('docs', 2)
+        second.count('docs', 3)
+        second.count('files')
+        first.merge(Instruments.from_dict(second.to_dict()))
+        self.assertEqual(first.counters, {'docs': 5, 'files': 1})
+        first.reset()
+        self.assertEqual(first.to_dict(), {'timers': {}, 'counters': {}})
+
+    def test_output_timed(self):
+        get_instruments().reset()
+        self.assertEqual(square(3), 9, "The decorated function still returns its result")
+        self.assertIn('square', get_instruments().timers)
+
+    def test_output_recording(self):
+        get_instruments().reset()
+        get_instruments().count('before')
+        with recording(Instruments()) as instruments:
+            square(3)
+            self.assertIs(get_instruments(), instruments)
+        self.assertIn('square', instruments.timers, "The timed functions record into the instruments of the task")
+        self.assertEqual(get_instruments().to_dict(), {'timers': {}, 'counters': {'before': 1}},
+                         "The process keeps its own timers and counters")
+        report = analyse_one_file('data/test_text.txt', 15, 3, 15)
+        self.assertNotIn('before', report.instruments['counters'], "A task does not depend on what ran before it")
+        self.assertEqual(report.instruments['counters']['files'], 1)
+        self.assertEqual(get_instruments().counters, {'before': 1})
+
+    def test_output_profiled(self):
+        directory = tempfile.mkdtemp()
+        try:
+            with profiled(directory):
+                square(4)
+            self.assertEqual(os.listdir(directory), [f'process-{os.getpid()}.pstats'])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> Test models module
+
+
+from unittest import TestCase, main
+from models import get_nlp, get_lexical_nlp, DEFAULT_MODEL, VSO_DISABLE
+
+
+class LpTest(TestCase):
+    """
+    test that the spaCy model is loaded once and that stages can switch off components
+    """
+
+    def test_output_get_nlp(self):
+        nlp = get_nlp()
+        self.assertIs(get_nlp(DEFAULT_MODEL), nlp, "The model is only loaded once per process")
+
+    def test_output_disable(self):
+        doc = get_nlp()("Elizabeth loved Darcy in London.", disable=VSO_DISABLE)
+        self.assertEqual(len(doc.ents), 0, "No named entities without the NER component")
+        self.assertIn("ner", get_nlp().pipe_names, "Disabling a component for one call keeps it in the model")
+
+    def test_output_lexical_nlp(self):
+        nlp = get_lexical_nlp()
+        self.assertEqual(nlp.pipe_names, ["sentencizer"], "Only the tokenizer and the sentencizer")
+        self.assertEqual(len(list(nlp("I like apple. He eats pear.").sents)), 2)
+        self.assertIs(get_lexical_nlp(DEFAULT_MODEL, ()), nlp, "The lexical pipeline is only loaded once per process")
+        names = get_lexical_nlp(DEFAULT_MODEL, ("ents",)).pipe_names
+        self.assertIn("ner", names)
+        self.assertNotIn("parser", names)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> Test output_sinks module
+
+
+import csv
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+from unittest import TestCase, main
+from parsing_file import FileReport
+from output_sinks import TerminalSink, HtmlSink, TableSink, export_sink, import_pyarrow, render_html, render_html_head
+
+REPORTS = [FileReport('data/PrideAndPrejudice.txt', 4.2, 18.5, [(('Elizabeth', 'PERSON'), 600)], [('say', 400)],
+                      [(('say', 'she', 'nothing'), 12)]),
+           FileReport('data/Politics.txt', 4.6, 30.1, [(('Athens', 'GPE'), 50)], [('make', 300)],
+                      [(('make', 'it', 'a state'), 3)])]
+
+
+class LpTest(TestCase):
+    """
+    test that every sink writes all the reports it gets
+    """
+
+    def test_output_terminal_sink(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            sink = TerminalSink()
+            sink.start([r.file for r in REPORTS])
+            for report in REPORTS:
+                sink.write(report)
+            sink.close()
+        self.assertIn("PrideAndPrejudice.txt", out.getvalue())
+        self.assertIn("('make', 'it', 'a state') --> 3", out.getvalue())
+
+    def test_output_html_sink(self):
+        fd, outfile = tempfile.mkstemp(suffix='.html')
+        os.close(fd)
+        sink = HtmlSink(outfile, 1, 1, 1)
+        sink.start([r.file for r in REPORTS])
+        for report in REPORTS:
+            sink.write(report)
+        sink.close()
+        with open(outfile, encoding='utf-8') as infile:
+            html = infile.read()
+        os.remove(outfile)
+        self.assertTrue(html.startswith('<html>') and html.endswith('</html>'))
+        self.assertEqual(html.count('<tr> '), 2, "One row per file")
+        self.assertLess(html.index('PrideAndPrejudice'), html.index('<td>Politics'), "Rows in the order of the files")
+
+    def test_output_html_stream(self):
+        fd, outfile = tempfile.mkstemp(suffix='.html')
+        os.close(fd)
+        sink = HtmlSink(outfile, 1, 1, 1, stream=True)
+        sink.start([r.file for r in REPORTS])
+        sink.write(REPORTS[0])
+        with open(outfile, encoding='utf-8') as infile:
+            self.assertEqual(infile.read().count('<tr> '), 1, "A row is written as soon as its report comes")
+        sink.write(REPORTS[1])
+        sink.close()
+        with open(outfile, encoding='utf-8') as infile:
+            html = infile.read()
+        os.remove(outfile)
+        self.assertEqual(html, render_html(REPORTS, 1, 1, 1), "The same table as written at once")
+
+    def write_sink(self, sink):
+        sink.start([r.file for r in REPORTS])
+        for report in REPORTS:
+            sink.write(report)
+        sink.close()
+
+    def test_output_json_sinks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ['results.jsonl', 'results.json']:
+                outfile = os.path.join(directory, name)
+                self.write_sink(export_sink(outfile))
+                with open(outfile, encoding='utf-8') as infile:
+                    if name.endswith('.jsonl'):
+                        results = [json.loads(line) for line in infile]
+                    else:
+                        results = json.load(infile)
+                self.assertEqual(results, [r.to_dict() for r in REPORTS], name)
+        self.assertEqual(results[0]['top_ent'], [[['Elizabeth', 'PERSON'], 600]])
+        self.assertRaises(ValueError, export_sink, 'results.xml')
+
+    def test_output_table_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            outfile = os.path.join(directory, 'results.csv')
+            self.write_sink(TableSink(outfile))
+            with open(outfile, encoding='utf-8', newline='') as infile:
+                rows = list(csv.DictReader(infile))
+            self.assertEqual([row['corpus'] for row in rows], ['PrideAndPrejudice', 'Politics'])
+            self.assertEqual(json.loads(rows[1]['vso_objects']), ['a state'])
+            self.assertEqual(json.loads(rows[0]['entity_labels']), ['PERSON'])
+            # parquet, or csv without pyarrow
+            sink = TableSink(os.path.join(directory, 'results.parquet'), row_group_size=1)
+            self.write_sink(sink)
+            pyarrow = import_pyarrow()
+            if pyarrow is None:
+                self.assertEqual(sink.outfile, os.path.join(directory, 'results.csv'))
+            else:
+                table = pyarrow.parquet.read_table(sink.outfile)
+                self.assertEqual(table.column('verbs').to_pylist(), [['say'], ['make']])
+                self.assertEqual(table.column('avg_sent_len').to_pylist(), [18.5, 30.1])
+
+    def test_output_render_html_head(self):
+        head = render_html_head(['data/PrideAndPrejudice.txt', 'Politics.txt', 'corpora/news/NYT.txt'], 15, 3, 15)
+        self.assertIn('<title>Compare Corpora: PrideAndPrejudice VS. Politics VS. NYT</title>', head)
+        head = render_html_head([f'data/corpus_{i}.txt' for i in range(300)], 15, 3, 15)
+        self.assertIn('<title>Compare Corpora: 300 corpora</title>', head)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+# Task --> Test paragraph_memo module
+
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase, main
+import paragraph_memo
+from corpus_stats import CorpusStats
+from instrumentation import get_instruments
+from paragraph_memo import get_memo, ParagraphMemo
+from parsing_file import preprocess_one_file
+from parse_cache import ParseCache
+
+PARAGRAPHS = ['[Illustration]', 'I like apple and pear.', 'Mary likes London. John visits Paris.',
+              '[Illustration]', 'I like apple and pear.', 'We like the weather.', '[Illustration]',
+              'Mary likes London. John visits Paris.']
+
+
+class LpTest(TestCase):
+    """
+    paragraph memo non-functional tests
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file = os.path.join(self.directory, 'text.txt')
+        with open(self.file, 'w', encoding='utf-8') as otf:
+            otf.write('\n\n'.join(PARAGRAPHS))
+        paragraph_memo._memos.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        paragraph_memo._memos.clear()
+
+    def test_output_same_stats(self):
+        target = preprocess_one_file(self.file, 15, 3, batch_size=1)
+        get_instruments().reset()
+        result = preprocess_one_file(self.file, 15, 3, batch_size=1, dedup=10)
+        self.assertEqual(result[:4], target[:4])
+        self.assertEqual(result[4].to_dict(), target[4].to_dict(), "Every repeat is counted, in its place")
+        counters = get_instruments().to_dict()['counters']
+        self.assertEqual(counters['memo_hits'], 1, "A paragraph is kept when it comes the second time")
+        self.assertEqual(counters['docs'], 7)
+        get_instruments().reset()
+        preprocess_one_file(self.file, 15, 3, batch_size=1, dedup=10)
+        counters = get_instruments().to_dict()['counters']
+        self.assertEqual((counters['memo_hits'], counters['docs']), (7, 1), "The next file reuses them")
+
+    def test_output_prefetch(self):
+        target = preprocess_one_file(self.file, 15, 3)
+        get_instruments().reset()
+        # all the paragraphs are taken by nlp.pipe before the first one is parsed
+        result = preprocess_one_file(self.file, 15, 3, dedup=10)
+        self.assertEqual(result[4].to_dict(), target[4].to_dict())
+        counters = get_instruments().to_dict()['counters']
+        self.assertEqual((counters['memo_hits'], counters['docs']), (1, 7), "A repeat waits for the kept paragraph")
+
+    def test_output_lru(self):
+        memo = ParagraphMemo(2)
+        for i in range(3):
+            stats = CorpusStats()
+            stats.sent_sum = i
+            memo.put(memo.key(str(i)), stats)
+        self.assertEqual(len(memo), 2)
+        self.assertIsNone(memo.get(memo.key('0')), "The least recently used paragraph goes first")
+        self.assertEqual(memo.get(memo.key('1')).sent_sum, 1)
+
+    def test_output_threads(self):
+        with ThreadPoolExecutor(8) as executor:
+            memos = list(executor.map(lambda _: get_memo(10, self.directory), range(32)))
+        self.assertTrue(all(memo is memos[0] for memo in memos), "One memo per process, also with several threads")
+
+    def test_output_on_disk(self):
+        preprocess_one_file(self.file, 15, 3, batch_size=1, dedup=10, cache=ParseCache(self.directory))
+        # the repeated paragraphs, not the ones seen once
+        entries = [name for name in os.listdir(os.path.join(self.directory, 'paragraphs')) if name.endswith('.json')]
+        self.assertEqual(len(entries), 3)
+        paragraph_memo._memos.clear()
+        memo = get_memo(10, self.directory)
+        self.assertEqual(memo.get(memo.key('[Illustration]')).token_sum, 3, "Another process reads it from disk")
+
+
+if __name__ == '__main__':
+    main()
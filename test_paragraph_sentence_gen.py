@@ -19,10 +19,21 @@
 # Task --> Test paragraph_sentence_gen module
 # 1. test generate_para
 # 2. test generate_sent
+# 3. test generate_shards
+# 4. test generate_para_offsets
+# 5. test split_long_paragraph
+# 6. test drop_boilerplate
 
 
+import bz2
+import gzip
+import io
+import os
+import shutil
+import tempfile
 from unittest import TestCase, main
-from paragraph_sentence_gen import generate_para, generate_sent
+from paragraph_sentence_gen import generate_para, generate_sent, generate_shards, generate_para_offsets, \
+    split_long_paragraph, drop_boilerplate, read_paragraphs, text_paragraphs
 
 
 class LpTest(TestCase):
@@ -45,6 +56,65 @@ class LpTest(TestCase):
         self.assertIsInstance(result, object, "Required type is an object")
         self.assertEqual(len(list(result)), 1, "There is one element been yielded")
 
+    def test_output_generate_shards(self):
+        paragraphs = list(generate_para("data/Russell_ProblemsOfPhilosophy.txt"))
+        shards = list(generate_shards("data/Russell_ProblemsOfPhilosophy.txt", 10))
+        self.assertTrue(all(len(shard) == 10 for shard in shards[:-1]), "Only the last shard may be smaller")
+        self.assertEqual([p for shard in shards for p in shard], paragraphs, "No paragraph is lost or reordered")
+
+    def test_output_generate_para_offsets(self):
+        text = b'First line\nwrapped here.\n\n  \n  Second \xc3\xa9t\xc3\xa9.\r\n\r\nLast one, no blank line'
+        directory = tempfile.mkdtemp()
+        try:
+            file = os.path.join(directory, 'corpus.txt')
+            with open(file, 'wb') as otf:
+                otf.write(text)
+            target = ['First line wrapped here.', 'Second \u00e9t\u00e9.', 'Last one, no blank line']
+            result = list(generate_para_offsets(file))
+            self.assertEqual([p for p, _, _ in result], target, "Lines are joined with a space, none is lost")
+            self.assertEqual(text[result[1][1]:result[1][2]].decode('utf-8'), target[1], "Byte offsets of the text")
+            self.assertEqual(list(generate_para_offsets(file, block_size=3)), result, "Blocks do not change anything")
+            self.assertEqual(len(list(generate_para(file, 'line'))), 4, "Every line is a paragraph")
+            for module, name in ((gzip, 'corpus.txt.gz'), (bz2, 'corpus.txt.bz2')):
+                with module.open(os.path.join(directory, name), 'wb') as otf:
+                    otf.write(text)
+                self.assertEqual(list(generate_para_offsets(os.path.join(directory, name))), result)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_output_split_long_paragraph(self):
+        para = 'He said "Stop!" and left. ' * 40 + 'x' * 300
+        result = list(split_long_paragraph(para, 80))
+        self.assertTrue(all(len(piece) <= 80 for piece in result), "No piece is longer than the budget")
+        self.assertTrue(result[0].endswith('left.'), "A piece ends at the end of a sentence")
+        self.assertEqual(''.join(result).replace(' ', ''), para.replace(' ', ''), "No text is lost")
+        self.assertEqual(list(split_long_paragraph('Short.', 100)), ['Short.'])
+        paragraphs = list(generate_para("data/Russell_ProblemsOfPhilosophy.txt", max_chars=500))
+        self.assertTrue(all(len(p) <= 500 for p in paragraphs))
+        self.assertGreater(len(paragraphs), len(list(generate_para("data/Russell_ProblemsOfPhilosophy.txt"))))
+        text = ('\n\n' + para.replace('. ', '.\n  ')) * 3
+        target = [piece for paragraph in text_paragraphs(text, max_chars=None)
+                  for piece in split_long_paragraph(paragraph, 80)]
+        for block_size in (1, 7, 1 << 20):
+            result = list(read_paragraphs(io.BytesIO(text.encode('utf-8')), block_size=block_size, max_chars=80))
+            self.assertEqual(result, target, "The pieces are the same when a paragraph is split while it is read")
+
+    def test_output_drop_boilerplate(self):
+        text = ("The Project Gutenberg eBook of Emma\n\nThis eBook is for the use of anyone anywhere.\n\n"
+                "*** START OF THE PROJECT GUTENBERG EBOOK EMMA ***\n\nEMMA\n\nChapter 1\n\n"
+                "*** END OF THE PROJECT GUTENBERG EBOOK EMMA ***\n\nSection 1. General Terms of Use\n")
+        directory = tempfile.mkdtemp()
+        try:
+            file = os.path.join(directory, 'emma.txt')
+            with open(file, 'w', encoding='utf-8') as otf:
+                otf.write(text)
+            self.assertEqual(list(generate_para(file, boilerplate=True)), ['EMMA', 'Chapter 1'])
+            self.assertEqual(len(list(generate_para(file))), 7)
+        finally:
+            shutil.rmtree(directory)
+        paragraphs = list(generate_para_offsets("data/Politics.txt"))
+        self.assertEqual(list(drop_boilerplate(paragraphs, 10)), paragraphs, "A text without a start line is kept")
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> Test parse_cache module
+
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase, main
+from unittest.mock import patch
+from parse_cache import ParseCache, cache_key
+
+# the keys of the cache are sha256 hex digests
+KEYS = {name: hashlib.sha256(name.encode('utf-8')).hexdigest()
+        for name in ('abc', 'first', 'second', 'third', 'file')}
+
+
+class LpTest(TestCase):
+    """
+    ParseCache non-functional tests
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_output_get_put(self):
+        cache = ParseCache(self.directory)
+        self.assertIsNone(cache.get(KEYS['abc']))
+        cache.put(KEYS['abc'], {'sent_sum': 3})
+        self.assertEqual(cache.get(KEYS['abc']), {'sent_sum': 3})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_output_cache_key(self):
+        file = os.path.join(self.directory, 'corpus.txt')
+        with open(file, 'w', encoding='utf-8') as otf:
+            otf.write('I like apple and pear.\n')
+        key = cache_key(file, 'en_core_web_sm', {'vso_capacity': None})
+        self.assertEqual(key, cache_key(file, 'en_core_web_sm', {'vso_capacity': None}))
+        self.assertNotEqual(key, cache_key(file, 'en_core_web_sm', {'vso_capacity': 100}), "Settings are in the key")
+        self.assertNotEqual(key, cache_key(file, 'en_core_web_md', {'vso_capacity': None}), "The model is in the key")
+        with open(file, 'a', encoding='utf-8') as otf:
+            otf.write('I eat apple.\n')
+        self.assertNotEqual(key, cache_key(file, 'en_core_web_sm', {'vso_capacity': None}), "The content is in the key")
+
+    def test_output_evict(self):
+        cache = ParseCache(self.directory, max_size_mb=1)
+        data = {'text': 'x' * 400 * 1024}
+        for key in ('first', 'second'):
+            cache.put(KEYS[key], data)
+            time.sleep(0.05)
+        # reading 'first' makes 'second' the least recently used entry
+        self.assertIsNotNone(cache.get(KEYS['first']))
+        time.sleep(0.05)
+        cache.put(KEYS['third'], data)
+        self.assertIsNotNone(cache.get(KEYS['first']))
+        self.assertIsNone(cache.get(KEYS['second']), "The least recently used entry is removed")
+        self.assertIsNotNone(cache.get(KEYS['third']))
+
+    def test_output_subcache(self):
+        cache = ParseCache(self.directory, max_size_mb=1)
+        paragraphs = cache.subcache('paragraphs')
+        data = {'text': 'x' * 300 * 1024}
+        cache.put(KEYS['file'], data)
+        time.sleep(0.05)
+        for key in ('first', 'second', 'third'):
+            paragraphs.put(KEYS[key], data)
+        self.assertIsNone(cache.get(KEYS['file']), "The subdirectory counts towards the size limit of the cache")
+        self.assertIsNotNone(paragraphs.get(KEYS['third']))
+        listed = []
+        listdir = os.listdir
+        with patch('parse_cache.os.listdir', side_effect=lambda path: listed.append(path) or listdir(path)):
+            for i in range(3):
+                paragraphs.put(hashlib.sha256(bytes([i])).hexdigest(), {'sent_sum': i})
+        self.assertEqual(listed, [], "The directory is not listed for every entry written")
+
+    def test_output_foreign_files(self):
+        cache = ParseCache(self.directory, max_size_mb=1)
+        os.makedirs(os.path.join(self.directory, 'sub'))
+        foreign = [os.path.join(self.directory, 'results.json'), os.path.join(self.directory, 'sub', 'settings.json'),
+                   os.path.join(self.directory, 'notes.txt')]
+        for file in foreign:
+            with open(file, 'w', encoding='utf-8') as otf:
+                otf.write('x' * 300 * 1024)
+        time.sleep(0.05)
+        data = {'text': 'x' * 400 * 1024}
+        for key in ('first', 'second', 'third'):
+            cache.put(KEYS[key], data)
+        self.assertIsNone(cache.get(KEYS['first']), "The cache still evicts its own entries")
+        self.assertTrue(all(os.path.exists(file) for file in foreign), "Other files in the directory are kept")
+        with self.assertRaises(ValueError):
+            cache.put('../results', data)
+
+
+if __name__ == '__main__':
+    main()
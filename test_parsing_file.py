@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+
+# Task --> Test parsing_file module
+
+
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+from multiprocessing import Pool
+from unittest import TestCase, main
+from parsing_file import preprocess_one_file, preprocess_one_file_sharded, get_vso_one_file, analyse_one_file
+from output_sinks import MISSING, TerminalSink, render_html
+
+TEXT = 'I eat apple. He drinks orange juice.\n\nThe cake is made by my mother.\n\n' \
+       'Mr. Bingley returned Mr. Bennet’s visit.\nHe saw only the father.\n\nI like apple and pear.\n\n' \
+       'Elizabeth loved Darcy. Jane wrote a letter to Elizabeth in London.\n\n'
+
+
+class LpTest(TestCase):
+    """
+    test that a file preprocessed in shards gives the same results as in one piece
+    """
+
+    def setUp(self):
+        fd, self.file = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w', encoding='utf-8') as otf:
+            otf.write(TEXT * 3)
+
+    def tearDown(self):
+        os.remove(self.file)
+
+    def test_output_preprocess_one_file_sharded(self):
+        target = preprocess_one_file(self.file, 15, 3)
+        with Pool(2) as pool:
+            for shard_size in (1, 4, 100):
+                result = preprocess_one_file_sharded(self.file, 15, 3, pool, shard_size, window=2)
+                self.assertEqual(result[:4], target[:4], "Sharding should not change any result")
+                self.assertEqual(result[4].to_dict(), target[4].to_dict(), "Sharding should not change any result")
+        self.assertEqual(get_vso_one_file(result[4], result[3], 15), get_vso_one_file(target[4], target[3], 15))
+
+    def test_output_analyse_one_file(self):
+        target = preprocess_one_file(self.file, 15, 3)
+        target_vso = get_vso_one_file(target[4], target[3], 15)
+        result = analyse_one_file(self.file, 15, 3, 15)
+        self.assertEqual((result.avg_word_len, result.avg_sent_len, result.top_ent, result.top_verb), target[:4])
+        self.assertEqual(result.vso_triples, target_vso)
+        self.assertGreater(result.peak_rss, 0, "The peak memory of the process is reported")
+        self.assertIsNone(result.cache_status, "There is no cache")
+        self.assertEqual(result.instruments['counters']['files'], 1, "The timers and counters come with the results")
+        self.assertEqual(result.instruments['counters']['tokens'], target[4].token_sum)
+
+    def test_output_empty_file(self):
+        empties = []
+        for text in ('', ' \n\n  \n'):
+            fd, empty = tempfile.mkstemp(suffix='.txt')
+            with os.fdopen(fd, 'w', encoding='utf-8') as otf:
+                otf.write(text)
+            empties.append(empty)
+        reports = [analyse_one_file(file, 15, 3, 15) for file in empties + [self.file]]
+        for empty in empties:
+            os.remove(empty)
+        for report in reports[:2]:
+            self.assertEqual((report.avg_word_len, report.avg_sent_len), (None, None), "Nothing to average")
+            self.assertEqual((report.top_ent, report.top_verb, report.vso_triples), ([], [], []))
+        self.assertIsNotNone(reports[2].avg_word_len, "The other files are still analysed")
+        out = io.StringIO()
+        with redirect_stdout(out):
+            sink = TerminalSink()
+            sink.start([r.file for r in reports])
+            for report in reports:
+                sink.write(report)
+            sink.close()
+        self.assertIn(f"Average word length: {MISSING}", out.getvalue())
+        self.assertIn(f"<td>{MISSING}</td>", render_html(reports, 1, 1, 1))
+
+    def test_output_lexical(self):
+        target = preprocess_one_file(self.file, 15, 3)[4]
+        result = preprocess_one_file(self.file, 15, 3, lexical=[])[4]
+        self.assertEqual((result.token_sum, result.char_sum), (target.token_sum, target.char_sum))
+        self.assertEqual(result.sent_sum, 24, "The sentences come from the sentencizer")
+        self.assertEqual((len(result.ner_counts), len(result.verb_counts), len(result.vso_candidates)), (0, 0, 0))
+        result = preprocess_one_file(self.file, 15, 3, lexical=['ents', 'verbs'])[4]
+        self.assertEqual(result.ner_counts, target.ner_counts, "The named entities do not need the parser")
+        self.assertEqual(list(result.verb_counts.items()), list(target.verb_counts.items()))
+        self.assertEqual(len(result.vso_candidates), 0, "No VSO triples without the parser")
+
+    def test_output_get_vso_one_file(self):
+        stats = preprocess_one_file(self.file, 15, 3)[4]
+        stats.vso_candidates.update([('eat', 'I', 'apple'), ('drink', 'He', 'juice'), ('by', 'who', 'what')])
+        result = dict(get_vso_one_file(stats, [('eat', 10)], 15))
+        self.assertIn(('eat', 'I', 'apple'), result)
+        self.assertIn(('by', 'who', 'what'), result)
+        self.assertNotIn(('drink', 'He', 'juice'), result, "Only the triples of the target verbs are kept")
+
+
+if __name__ == '__main__':
+    main()
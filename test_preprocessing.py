@@ -20,7 +20,11 @@
 
 
 from unittest import TestCase, main
-from preprocessing import Preprocessor
+from collections import Counter
+import numpy as np
+from preprocessing import Preprocessor, count_verbs, first_seen_counts
+from models import get_nlp
+from corpus_stats import CorpusStats
 
 
 class LpTest(TestCase):
@@ -38,6 +42,19 @@ class LpTest(TestCase):
         self.assertEqual(len(result), 3)
         self.assertIn('Mr. Bingley', result[0], "'Mr. Bingley' should not be split")
 
+    def test_output_reuse_parsed_doc(self):
+        paras = ['I like apple and pear.', 'I eat apple. He drinks orange juice.']
+        for para, doc in zip(paras, get_nlp().pipe(paras, batch_size=2)):
+            para_obj = Preprocessor(para, doc)
+            self.assertIs(para_obj.doc, doc, "A Doc from nlp.pipe should not be parsed again")
+            self.assertEqual(para_obj.number_token, len(Preprocessor(para).doc))
+
+    def test_output_get_sentence_chunks(self):
+        para = 'I eat apple. He drinks orange juice.'
+        para_obj = Preprocessor(para)
+        self.assertEqual(len(para_obj.chunks), para_obj.number_sent, "There is one chunk list per sentence")
+        self.assertIn(('apple', 'dobj', 'eat'), para_obj.chunks[0])
+
     def test_output_parse_token_lemma_dependency(self):
         para = 'I like apple and pear.'
         para_obj = Preprocessor(para)
@@ -45,31 +62,68 @@ class LpTest(TestCase):
         self.assertIsInstance(result[0], list, "Required type is list")
         self.assertEqual(result[1], 18, "There are 18 characters")
 
+    def test_output_token_array_counts(self):
+        para = 'I eat apple. He drinks orange juice.'
+        para_obj = Preprocessor(para)
+        self.assertNotIn('tok_lem_dep', vars(para_obj), "The tuples are only made when asked for")
+        self.assertEqual(para_obj.number_sent, len(list(para_obj.doc.sents)))
+        self.assertEqual(para_obj.number_token, len(para_obj.tok_lem_dep))
+        self.assertEqual(para_obj.number_char, para_obj._parse_token_lemma_dependency()[1])
+        self.assertEqual(Preprocessor('').number_sent, 0, "An empty paragraph has no sentences")
+
     def test_output_get_verb(self):
         para_1 = 'I like apple and pear.'
         para_2 = 'I eat apple. He drinks orange juice. We like the weather.'
         p1 = Preprocessor(para_1)
-        Preprocessor.get_verb(p1)
+        verb_counts = p1.get_verb()
         p2 = Preprocessor(para_2)
-        Preprocessor.get_verb(p2)
-        result = dict(Preprocessor.verb_counts)
+        p2.get_verb(verb_counts)
+        result = dict(verb_counts)
         target = {'like': 2, 'eat': 1, 'drink': 1}
         self.assertEqual(result, target)
         self.assertIsInstance(result, dict, "Required type is dict")
         self.assertEqual(len(result), len(target))
 
+    def test_output_count_verbs(self):
+        paras = ['I like apple and pear.', 'I eat apple. He drinks orange juice. We like the weather.']
+        objs = [Preprocessor(para) for para in paras]
+        target = Counter()
+        for para_obj in objs:
+            for token in para_obj.doc:
+                if token.pos_ == "VERB":
+                    target[token.lemma_] += 1
+        result = count_verbs([p.token_array for p in objs], objs[0].doc.vocab.strings)
+        self.assertEqual(list(result.items()), list(target.items()), "Same counts in the same order")
+        self.assertEqual(first_seen_counts(np.array([7, 3, 7, 5, 3, 7])), ([7, 3, 5], [3, 2, 1]))
+
+    def test_output_get_ner(self):
+        para = 'Elizabeth Bennet met Mr. Darcy in London on Monday. Jane stayed at Netherfield with Mr. Bingley.'
+        para_obj = Preprocessor(para)
+        target = Counter((ent.text, ent.label_) for ent in para_obj.doc.ents)
+        self.assertEqual(list(para_obj.get_ner().items()), list(target.items()), "The same entities as doc.ents")
+
     def test_output_get_sum_token_sent_char(self):
         para_1 = 'I like apple and pear.'
         para_2 = 'I eat apple. He drinks orange juice. We like the weather.'
         p1 = Preprocessor(para_1)
         p2 = Preprocessor(para_2)
-        Preprocessor.get_sum_token_sent_char(p1)
-        Preprocessor.get_sum_token_sent_char(p2)
-        self.assertIsInstance(Preprocessor.sent_sum, int)
-        self.assertEqual(Preprocessor.sent_sum, 4)
-        self.assertEqual(Preprocessor.token_sum, 20)
-        self.assertEqual(Preprocessor.char_sum, 65)
-        
+        stats = CorpusStats()
+        p1.get_sum_token_sent_char(stats)
+        p2.get_sum_token_sent_char(stats)
+        self.assertIsInstance(stats.sent_sum, int)
+        self.assertEqual(stats.sent_sum, 4)
+        self.assertEqual(stats.token_sum, 20)
+        self.assertEqual(stats.char_sum, 65)
+
+    def test_output_update_stats(self):
+        para = 'I eat apple. He drinks orange juice.'
+        p = Preprocessor(para)
+        stats = p.update_stats(CorpusStats())
+        self.assertEqual(stats.sent_sum, p.number_sent)
+        self.assertEqual(stats.vso_candidates, p.get_vso_candidates())
+        self.assertEqual(stats.verb_counts, p.get_verb())
+        self.assertEqual(stats.ner_counts, p.get_ner())
+
 
 if __name__ == '__main__':
     main()
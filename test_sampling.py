@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+# Task --> Test sampling module
+
+
+import random
+from collections import Counter
+from unittest import TestCase, main
+import numpy as np
+from parsing_file import analyse_one_file
+from sampling import analyse_one_sample, ratio_interval, reservoir_sample, stratified_sample, top_stability
+
+
+class LpTest(TestCase):
+    """
+    paragraph sampling non-functional tests
+    """
+
+    def test_output_reservoir_sample(self):
+        sample, number = reservoir_sample(iter(range(1000)), 50, random.Random(1))
+        self.assertEqual(number, 1000)
+        self.assertEqual(len(sample), 50)
+        self.assertEqual(sample, sorted(sample), "The sample is in the order of the stream")
+        self.assertEqual(sample, reservoir_sample(iter(range(1000)), 50, random.Random(1))[0], "Same seed, same sample")
+        self.assertEqual(reservoir_sample(iter(range(5)), 50, random.Random(1)), ([0, 1, 2, 3, 4], 5))
+
+    def test_output_stratified_sample(self):
+        sample = stratified_sample(iter(range(1000)), 10, 1000, random.Random(1))
+        self.assertEqual([i // 100 for i in sample], list(range(10)), "One paragraph out of every part of the file")
+
+    def test_output_bootstrap(self):
+        weights = np.ones((20, 3), dtype=np.int64)
+        self.assertEqual(ratio_interval(weights, [4, 6, 8], [2, 2, 2]), [3.0, 3.0])
+        counters = [Counter({'say': 3, 'go': 1}), Counter({'say': 2, 'make': 1}), Counter({'go': 1})]
+        self.assertEqual(top_stability(weights, counters, [('say', 5), ('go', 2)]), [('say', 1.0), ('go', 1.0)])
+
+    def test_output_whole_file(self):
+        file = 'data/test_text.txt'
+        report = analyse_one_sample(file, 15, 3, 15, 1000)
+        target = analyse_one_file(file, 15, 3, 15)
+        self.assertEqual(report.sample['paragraphs'], report.sample['population'])
+        for key in ['avg_word_len', 'avg_sent_len', 'top_ent', 'top_verb', 'vso_triples']:
+            self.assertEqual(getattr(report, key), getattr(target, key), key)
+        self.assertEqual(report.sample['avg_word_len_ci'], [target.avg_word_len] * 2, "A sample of all is exact")
+
+
+if __name__ == '__main__':
+    main()
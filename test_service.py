@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# University of Zurich
+# Department of Computational Linguistics
+
+# Author(s): Cui Ding
+# date: 18.10.2026
+
+# Intermediate Methods and Programming in Digital Linguistics
+# Project: Corpus Comparison
+
+# Example corpora:
+# Downloaded from Gutenberg.
+# Hard wrapped text file.
+# 1. Pride and Prejudice, written by Jane Austen.
+# 2. Politics.
+# Task --> Test service module
+
+
+import asyncio
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase, main
+from parsing_file import analyse_one_file
+from service import AnalysisService, Batcher, warm_up
+
+TEXTS = ['I like apple and pear.\n\nI eat apple. He drinks\norange juice.',
+         'We like the weather.\n\nShe eats pear. They like apple and pear.',
+         'Mary likes London.\n\nJohn visits Paris. Mary likes Paris.']
+
+
+async def post(port, path, request):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = json.dumps(request).encode('utf-8')
+    writer.write(f'POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+    await writer.drain()
+    answer = await reader.read()
+    writer.close()
+    head, _, payload = answer.partition(b'\r\n\r\n')
+    return int(head.split()[1]), payload.decode('utf-8')
+
+
+class LpTest(TestCase):
+    """
+    analysis service non-functional tests
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(1)
+        cls.executor.submit(warm_up).result()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def run_service(self, *requests, max_delay=0.5):
+        async def run():
+            batcher = Batcher(self.executor, max_delay=max_delay)
+            batcher.start()
+            server = await asyncio.start_server(AnalysisService(self.executor, batcher).handle, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                answers = await asyncio.gather(*(post(port, path, request) for path, request in requests))
+            return answers, batcher.batches
+        return asyncio.run(run())
+
+    def test_output_text(self):
+        requests = [('/analyse', {'documents': [{'name': f'text {i}', 'text': text}]}) for i, text in enumerate(TEXTS)]
+        answers, batches = self.run_service(*requests)
+        self.assertEqual(batches, 1, "The paragraphs of concurrent requests are parsed in one batch")
+        with tempfile.TemporaryDirectory() as directory:
+            for (status, payload), text in zip(answers, TEXTS):
+                self.assertEqual(status, 200)
+                file = os.path.join(directory, 'text.txt')
+                with open(file, 'w', encoding='utf-8') as otf:
+                    otf.write(text)
+                target = analyse_one_file(file, 15, 3, 15).to_dict()
+                report = json.loads(payload)['reports'][0]
+                for key in ['avg_word_len', 'avg_sent_len', 'top_ent', 'top_verb', 'vso_triples']:
+                    self.assertEqual(report[key], json.loads(json.dumps(target[key])), key)
+
+    def test_output_html(self):
+        request = {'documents': [{'name': 'apple', 'text': TEXTS[0]}], 'format': 'html'}
+        [(status, payload)], _ = self.run_service(('/analyse', request), max_delay=0.01)
+        self.assertEqual(status, 200)
+        self.assertTrue(payload.startswith('<html>') and payload.endswith('</html>'))
+        self.assertIn('<td>apple</td>', payload)
+
+    def test_output_errors(self):
+        answers, _ = self.run_service(('/analyse', {'documents': []}), ('/analyse', {'documents': [{'text': ' '}]}),
+                                      ('/analyse', {'documents': [{'file': 'no/such/file.txt'}]}),
+                                      ('/missing', {}), max_delay=0.01)
+        self.assertEqual([status for status, _ in answers], [400, 400, 400, 404])
+
+
+if __name__ == '__main__':
+    main()